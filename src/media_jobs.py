@@ -0,0 +1,75 @@
+"""
+Media encoding jobs for the server's worker processes.
+
+Kept apart from server.py so spawned workers import only numpy and cv2,
+not fastmcp and the whole MCP server. Large arrays arrive as shared
+memory descriptors created by the server (see server._to_shared).
+"""
+
+import io
+import wave
+
+import numpy as np
+
+
+def encode_jpeg(frame: np.ndarray, width: int = 0, quality: int = 85) -> bytes:
+    """JPEG-encode a BGR frame, downscaled to `width` pixels if smaller."""
+    import cv2
+
+    if 0 < width < frame.shape[1]:
+        height = int(round(frame.shape[0] * width / frame.shape[1]))
+        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes()
+
+
+def encode_wav(audio: np.ndarray, sample_rate: int, channels: int) -> bytes:
+    """Pack float32 or integer samples as 16-bit PCM WAV bytes."""
+    if audio.dtype == np.float32:
+        audio_int16 = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    else:
+        audio_int16 = audio.astype(np.int16)
+
+    wav_buffer = io.BytesIO()
+    with wave.open(wav_buffer, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)  # 16-bit
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(audio_int16.tobytes())
+    return wav_buffer.getvalue()
+
+
+def attach_shared(descriptor):
+    """Attach to a shared array in a worker. Returns (shm, view)."""
+    from multiprocessing import shared_memory
+
+    name, shape, dtype = descriptor
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: spawned workers share the parent's resource tracker,
+        # so this re-registration is a no-op and the parent's unlink() clears it
+        shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def jpeg_job(descriptor, width: int, quality: int) -> bytes:
+    shm, frame = attach_shared(descriptor)
+    try:
+        return encode_jpeg(frame, width, quality)
+    finally:
+        del frame
+        shm.close()
+
+
+def wav_job(descriptor, sample_rate: int, channels: int) -> bytes:
+    shm, audio = attach_shared(descriptor)
+    try:
+        return encode_wav(audio, sample_rate, channels)
+    finally:
+        del audio
+        shm.close()
+
+
+def warm_up() -> None:
+    """No-op submitted once per worker so the pool spawns before first use."""
@@ -5,25 +5,40 @@ MCP tools for controlling Pollen Robotics Reachy Mini robot.
 
 Architecture:
   MCP Tool Call → SDK → Daemon → Robot/Simulator
+  (stdio per client, or --transport http for many clients sharing one robot)
 
-7 tools (Miller's Law):
+9 tools (Miller's Law, 7 +/- 2):
   - speak(text, listen_after)  Voice + gesture + optionally hear response
-  - listen(duration)           STT via Deepgram Nova-2
-  - snap()                     Camera capture (base64 JPEG)
+  - listen(duration, pre_roll) STT via Deepgram Nova-2 (always-on mic buffer)
+  - snap(mode)                 Camera capture (JPEG + frame URI) or local detections
   - show(emotion, move)        Express emotion or play recorded move
   - look(roll, pitch, yaw, z)  Head positioning
   - rest(mode)                 neutral / sleep / wake
   - discover(library)          Find available recorded moves
+  - perform(script)            Run a multi-action script in one call
+  - track(action, target)      Closed-loop head tracking on the robot
 """
 
 import math
 import base64
+import contextlib
+import contextvars
+import functools
+import hashlib
+import inspect
 import os
+import threading
+import time
 from typing import Optional, Literal
 
 import numpy as np
 from fastmcp import FastMCP
 
+try:
+    from . import media_jobs
+except ImportError:  # Run as a script: python src/server.py
+    import media_jobs
+
 # Initialize MCP server
 mcp = FastMCP(
     name="reachy-mini",
@@ -37,10 +52,14 @@ mcp = FastMCP(
     - look() for precise head positioning
     - speak() to vocalize with [move:X] markers for choreography
     - listen() to hear and transcribe speech
-    - snap() to capture camera images
+    - snap() to capture camera images; snap(mode="summary") for cheap face detection
+      (captures stay available as reachy://frames/{id} resources)
     - rest() for neutral pose, sleep, or wake
+    - perform() to run several of the above in one call
+    - track() to keep looking at a person without repeated snap()/look()
 
     Prefer show() for common emotions, show(move=...) for nuanced expressions.
+    Prefer perform() over chains of single calls to cut round trips.
     """
 )
 
@@ -132,6 +151,7 @@ EXPRESSIONS = {
 # ==============================================================================
 
 _robot_instance = None
+_init_lock = threading.RLock()  # Guards lazy singletons against concurrent first calls
 
 def get_robot():
     """
@@ -140,7 +160,11 @@ def get_robot():
     Uses no_media backend for headless simulation compatibility.
     """
     global _robot_instance
-    if _robot_instance is None:
+    if _robot_instance is not None:
+        return _robot_instance
+    with _init_lock:
+        if _robot_instance is not None:
+            return _robot_instance
         try:
             from reachy_mini import ReachyMini
             # Use 'default' for full media (audio + camera) - requires real hardware
@@ -157,7 +181,7 @@ def get_robot():
             raise RuntimeError(
                 f"Could not connect to Reachy Mini. Is the daemon running? Error: {e}"
             )
-    return _robot_instance
+        return _robot_instance
 
 
 def cleanup_robot():
@@ -183,8 +207,8 @@ def create_head_pose_array(z: float = 0, roll: float = 0, pitch: float = 0, yaw:
     Args:
         z: Vertical position offset
         roll: Tilt left/right in degrees (positive = right ear toward shoulder)
-        pitch: Nod up/down in degrees (positive = looking up)
-        yaw: Turn left/right in degrees (positive = looking right)
+        pitch: Nod up/down in degrees (positive = nose down)
+        yaw: Turn left/right in degrees (positive = looking left)
 
     Returns:
         4x4 numpy transformation matrix
@@ -206,10 +230,1121 @@ def get_interpolation_method(method: str):
     return methods.get(method, InterpolationTechnique.MIN_JERK)
 
 
+# ==============================================================================
+# SESSION TRACING
+# ==============================================================================
+# Opt-in recorder: with REACHY_TRACE_FILE set, every tool call is appended as
+# one compact JSON line with its arguments, total time (including any queueing
+# for hardware, stage "queue") and per-stage times:
+#   {"t":1760000000.123,"client":"a1b2","tool":"speak","args":{...},"ms":2310.4,
+#    "stages":{"tts":812.0,"play":1450.2},"ok":true}
+# `reachy-mini-mcp replay TRACE` re-issues a trace to measure latency.
+
+TRACE_FILE = os.environ.get("REACHY_TRACE_FILE", "")
+
+_trace_stages = contextvars.ContextVar("trace_stages", default=None)
+# Time the current call spent queued for hardware in arbitrated(), if any
+_queued_ms = contextvars.ContextVar("queued_ms", default=0.0)
+
+
+class TraceRecorder:
+    """Append-only JSON-lines writer, safe to share across threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", buffering=1)  # Line buffered
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        import json
+
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+_trace_recorder: Optional[TraceRecorder] = None
+
+
+def start_trace():
+    """
+    Open the trace file when REACHY_TRACE_FILE is set.
+
+    Called from main() for server mode only, so media workers and the
+    replay client never open (or append to) the trace themselves.
+    """
+    global _trace_recorder
+    if TRACE_FILE and _trace_recorder is None:
+        _trace_recorder = TraceRecorder(TRACE_FILE)
+
+
+def cleanup_trace():
+    """Close the trace file on shutdown."""
+    global _trace_recorder
+    if _trace_recorder is not None:
+        _trace_recorder.close()
+        _trace_recorder = None
+
+
+@contextlib.contextmanager
+def trace_stage(name: str):
+    """Time a stage of the current tool call (no-op when not tracing)."""
+    stages = _trace_stages.get()
+    if stages is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        stages[name] = round(stages.get(name, 0.0) + elapsed, 1)
+
+
+def traced_stage(name: str):
+    """Decorator form of trace_stage for whole helper functions."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with trace_stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced(fn):
+    """Record a tool invocation to the trace file. Apply under @mcp.tool()."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _trace_recorder is None or _trace_stages.get() is not None:
+            return fn(*args, **kwargs)  # Not tracing, or nested in a traced call
+
+        # Queueing for motors/camera happens before this wrapper runs; count
+        # it, since it is usually what makes a call slow under contention
+        queued = _queued_ms.get()
+        stages: dict[str, float] = {"queue": round(queued, 1)} if queued else {}
+        token = _trace_stages.set(stages)
+        wall = time.time()
+        start = time.perf_counter()
+        ok = True
+        try:
+            result = fn(*args, **kwargs)
+            if isinstance(result, str) and result.startswith(_FAILURE_PREFIXES):
+                ok = False
+            return result
+        except Exception:
+            ok = False
+            raise
+        finally:
+            _trace_stages.reset(token)
+            bound = inspect.signature(fn).bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            recorder = _trace_recorder
+            if recorder is not None:
+                recorder.write({
+                    "t": round(wall - queued / 1000, 3),  # Arrival, for replay
+                    "client": _client_id.get(),
+                    "tool": fn.__name__,
+                    "args": dict(bound.arguments),
+                    "ms": round((time.perf_counter() - start) * 1000 + queued, 1),
+                    "stages": stages,
+                    "ok": ok,
+                })
+    return wrapper
+
+
+# Tools report errors as text; these prefixes mark a failed call in the trace
+_FAILURE_PREFIXES = (
+    "Unknown", "Expression failed", "Movement failed", "Speech failed",
+    "Listen failed", "Vision failed", "Rest failed", "Tracking failed",
+    "Failed", "Cannot connect", "No frame", "OpenCV not available",
+)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def replay_trace(path: str, server: str, speed: float = 1.0) -> str:
+    """
+    Re-issue a recorded trace against a server and report latency.
+
+    Calls keep their original relative start times divided by `speed`
+    (0 = fire everything back to back, as fast as the server allows).
+    `server` is anything fastmcp.Client accepts: a server script path
+    (spawned over stdio, without REACHY_TRACE_FILE so the replay is not
+    recorded into the trace being replayed) or an http(s) URL. A call
+    counts as an error when it raises, is flagged as an error, or
+    returns one of the tools' failure texts.
+
+    Returns:
+        Throughput and per-tool p50/p95/p99/max latency report
+    """
+    import asyncio
+    import json
+    from fastmcp import Client
+    from fastmcp.client.transports import PythonStdioTransport
+
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records:
+        return f"No calls in {path}"
+    t0 = records[0]["t"]
+
+    target = server
+    if server.endswith(".py"):
+        env = {k: v for k, v in os.environ.items() if k != "REACHY_TRACE_FILE"}
+        target = PythonStdioTransport(server, env=env)
+
+    def failed(result) -> bool:
+        if result.is_error:
+            return True
+        texts = [getattr(item, "text", "") for item in result.content]
+        return any(text.startswith(_FAILURE_PREFIXES) for text in texts)
+
+    async def _run():
+        latencies: dict[str, list[float]] = {}
+        errors = 0
+
+        async with Client(target) as client:
+            start = time.perf_counter()
+
+            async def issue(record):
+                nonlocal errors
+                if speed > 0:
+                    delay = (record["t"] - t0) / speed - (time.perf_counter() - start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                call_start = time.perf_counter()
+                try:
+                    result = await client.call_tool(
+                        record["tool"], record.get("args", {}), raise_on_error=False
+                    )
+                    errors += failed(result)
+                except Exception:
+                    errors += 1
+                latency = (time.perf_counter() - call_start) * 1000
+                latencies.setdefault(record["tool"], []).append(latency)
+
+            if speed > 0:
+                await asyncio.gather(*(issue(r) for r in records))
+            else:
+                for record in records:
+                    await issue(record)
+            return latencies, errors, time.perf_counter() - start
+
+    latencies, errors, elapsed = asyncio.run(_run())
+
+    lines = [
+        f"Replayed {len(records)} calls in {elapsed:.2f}s "
+        f"({len(records) / elapsed:.2f} calls/s, speed x{speed:g}, {errors} errors)"
+    ]
+    everything = [ms for values in latencies.values() for ms in values]
+    for tool, values in [("all", everything)] + sorted(latencies.items()):
+        lines.append(
+            f"  {tool:<10} n={len(values):<5} "
+            f"p50={_percentile(values, 50):8.1f}ms p95={_percentile(values, 95):8.1f}ms "
+            f"p99={_percentile(values, 99):8.1f}ms max={max(values):8.1f}ms"
+        )
+    return "\n".join(lines)
+
+
+# ==============================================================================
+# CLIENT ARBITRATION
+# ==============================================================================
+# In HTTP mode many clients share this process, one robot connection and all
+# caches. Each tool declares the hardware it needs; calls queue first-come
+# first-served on per-resource locks (acquired in sorted order, so no
+# deadlocks) and run on worker threads so the event loop keeps serving
+# other clients. Per-client call and queueing times are kept for
+# reachy://clients.
+
+MCP_TRANSPORT = os.environ.get("REACHY_MCP_TRANSPORT", "stdio")
+MCP_HOST = os.environ.get("REACHY_MCP_HOST", "127.0.0.1")
+MCP_PORT = int(os.environ.get("REACHY_MCP_PORT", "8765"))
+
+TOOL_THREADS = int(os.environ.get("REACHY_TOOL_THREADS", "32"))
+
+_client_id = contextvars.ContextVar("client_id", default=None)
+
+# Tool calls run on two bounded pools rather than the loop's default
+# executor (about 8 threads on the robot). Calls holding motors/camera are at
+# most one per resource, so their pool never fills; calls that block without
+# holding anything (listen sleeping, speech waiting for the speaker, coalesced
+# followers) share the other and can't starve an uncontended look().
+_holding_executor = None
+_free_executor = None
+
+
+class ResourceArbiter:
+    """FIFO locks for shared hardware plus per-client latency accounting."""
+
+    def __init__(self):
+        self._locks: dict = {}
+        self._holders: dict[str, Optional[str]] = {}
+        self._waiting: dict[str, int] = {}
+        self._clients: dict[str, dict] = {}
+        self._stats_lock = threading.Lock()
+
+    def _lock(self, resource: str):
+        import asyncio
+
+        if resource not in self._locks:
+            self._locks[resource] = asyncio.Lock()  # Wakes waiters in FIFO order
+        return self._locks[resource]
+
+    @contextlib.asynccontextmanager
+    async def hold(self, resources: set, client: str):
+        """Acquire every resource in `resources` for `client`."""
+        async with contextlib.AsyncExitStack() as stack:
+            for resource in sorted(resources):
+                lock = self._lock(resource)
+                self._waiting[resource] = self._waiting.get(resource, 0) + 1
+                try:
+                    await stack.enter_async_context(lock)
+                finally:
+                    self._waiting[resource] -= 1
+                self._holders[resource] = client
+                stack.callback(self._holders.__setitem__, resource, None)
+            yield
+
+    def record(self, client: str, tool: str, wait_ms: float, total_ms: float):
+        with self._stats_lock:
+            stats = self._clients.setdefault(client, {
+                "calls": 0, "total_ms": 0.0, "wait_ms": 0.0, "max_ms": 0.0, "last_tool": ""
+            })
+            stats["calls"] += 1
+            stats["total_ms"] += total_ms
+            stats["wait_ms"] += wait_ms
+            stats["max_ms"] = max(stats["max_ms"], total_ms)
+            stats["last_tool"] = tool
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            clients = {
+                client: {
+                    "calls": s["calls"],
+                    "avg_ms": round(s["total_ms"] / s["calls"], 1),
+                    "avg_wait_ms": round(s["wait_ms"] / s["calls"], 1),
+                    "max_ms": round(s["max_ms"], 1),
+                    "last_tool": s["last_tool"],
+                }
+                for client, s in self._clients.items()
+            }
+        resources = {
+            resource: {"holder": self._holders.get(resource), "waiting": self._waiting.get(resource, 0)}
+            for resource in sorted(self._locks)
+        }
+        return {"clients": clients, "resources": resources}
+
+
+_arbiter = ResourceArbiter()
+
+
+def _tool_executor(holding: bool):
+    """The thread pool for a tool call that does (or doesn't) hold hardware."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    global _holding_executor, _free_executor
+    with _init_lock:
+        if holding:
+            if _holding_executor is None:
+                _holding_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool-hold")
+            return _holding_executor
+        if _free_executor is None:
+            _free_executor = ThreadPoolExecutor(max_workers=TOOL_THREADS, thread_name_prefix="tool")
+        return _free_executor
+
+
+def _current_client() -> str:
+    """Identify the calling MCP client (session id), "local" outside a request."""
+    try:
+        from fastmcp.server.dependencies import get_context
+        ctx = get_context()
+        return ctx.client_id or ctx.session_id or "local"
+    except Exception:
+        return "local"
+
+
+def arbitrated(resources):
+    """
+    Run a sync tool on a worker thread while holding its hardware resources.
+
+    Resources stay held until the thread finishes, even if the call is
+    cancelled (client disconnect or timeout) while it runs.
+
+    `resources` is a set of names, or a callable taking the call's arguments
+    (defaults applied) and returning one. Apply under @mcp.tool().
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            import asyncio
+
+            needed = resources
+            if callable(resources):
+                bound = signature.bind_partial(*args, **kwargs)
+                bound.apply_defaults()
+                needed = resources(bound.arguments)
+
+            client = _current_client()
+            queued = time.perf_counter()
+            async with _arbiter.hold(needed, client):
+                started = time.perf_counter()
+                token = _client_id.set(client)
+                queued_token = _queued_ms.set((started - queued) * 1000)
+                try:
+                    # Copy the context so traces see the client and wait
+                    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+                    future = asyncio.get_running_loop().run_in_executor(
+                        _tool_executor(bool(needed)), call
+                    )
+                    try:
+                        return await asyncio.shield(future)
+                    except asyncio.CancelledError:
+                        # The thread can't be interrupted: keep the hardware
+                        # until it is really done, then report the cancel
+                        while not future.done():
+                            with contextlib.suppress(asyncio.CancelledError):
+                                await asyncio.wait({future})
+                        raise
+                finally:
+                    _queued_ms.reset(queued_token)
+                    _client_id.reset(token)
+                    done = time.perf_counter()
+                    _arbiter.record(
+                        client, fn.__name__,
+                        (started - queued) * 1000, (done - queued) * 1000
+                    )
+        return wrapper
+    return decorator
+
+
+# The speaker is arbitrated per utterance rather than per tool call, so
+# speech synthesis for concurrent calls can overlap (and be coalesced)
+# while each utterance - every chunk of a choreographed one - plays to
+# the end before the next starts. Recorded move sounds take the speaker
+# too, unless the utterance that fired the move already holds it
+# (_speaker_held is True on that thread).
+_speaker_lock = threading.Lock()
+_speaker_held = contextvars.ContextVar("speaker_held", default=False)
+
+
+def _tool_resources(action: dict) -> set:
+    """
+    Resources a tool call holds for its whole duration.
+
+    The mic is never locked across clients: listening only reads the shared
+    ring buffer, so any number of callers can do it at once.
+    """
+    return _action_resources(action) - {"speaker", "mic"}
+
+
+def _script_resources(arguments: dict) -> set:
+    """
+    Union of resources used anywhere in a perform() script.
+
+    Invalid scripts need nothing - perform() rejects them before running.
+    """
+    script = arguments.get("script")
+    if _validate_script(script):
+        return set()
+    needed = set()
+    for step in script:
+        for action in step if isinstance(step, list) else [step]:
+            needed |= _tool_resources(action)
+    return needed
+
+
+@mcp.resource("reachy://clients", mime_type="application/json")
+def client_stats() -> str:
+    """Per-client call latency and current hardware holders/queues."""
+    import json
+    return json.dumps(_arbiter.snapshot(), separators=(",", ":"))
+
+
+# ==============================================================================
+# REQUEST COALESCING
+# ==============================================================================
+# Identical upstream work already in flight (same TTS phrase, same audio for
+# STT, same daemon query) is done once and shared with every concurrent
+# caller. Counters for reachy://coalescing show how many calls were saved.
+
+
+class SingleFlight:
+    """
+    Share the result (or exception) of one in-flight call per key.
+
+    With `not_before` (a time.monotonic() value) a caller only joins a call
+    started at or after that time; an older call is left to its own callers
+    and a fresh one replaces it. Polls use this so nobody gets an answer
+    that predates their question.
+    """
+
+    def __init__(self):
+        self._calls: dict = {}
+        self._lock = threading.Lock()
+        self.upstream = 0  # Calls that actually went upstream
+        self.shared = 0    # Calls served by joining one already in flight
+
+    def do(self, key, fn, not_before: Optional[float] = None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None or (not_before is not None and call["started"] < not_before)
+            if leader:
+                call = {
+                    "done": threading.Event(), "result": None, "error": None,
+                    "started": time.monotonic(),
+                }
+                self._calls[key] = call
+                self.upstream += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:  # Not replaced by a fresher call
+                    del self._calls[key]
+            call["done"].set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"upstream": self.upstream, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+_tts_flight = SingleFlight()
+_stt_flight = SingleFlight()
+_daemon_flight = SingleFlight()
+
+
+@mcp.resource("reachy://coalescing", mime_type="application/json")
+def coalescing_stats() -> str:
+    """Upstream calls made vs. saved by sharing in-flight requests."""
+    import json
+    return json.dumps({
+        "tts": _tts_flight.stats(),
+        "stt": _stt_flight.stats(),
+        "daemon": _daemon_flight.stats(),
+    }, separators=(",", ":"))
+
+
+# ==============================================================================
+# MICROPHONE RING BUFFER
+# ==============================================================================
+# One long-lived recording session feeds a preallocated ring buffer.
+# Consumers (STT, VAD, level metering) read by absolute frame position
+# instead of re-opening the device, and listen() can reach back in time.
+
+MIC_BUFFER_SECONDS = float(os.environ.get("REACHY_MIC_BUFFER_SECONDS", "40"))
+# Off by default: right after speak() the buffer still holds the robot's own voice
+LISTEN_PRE_ROLL = float(os.environ.get("REACHY_LISTEN_PRE_ROLL", "0"))
+
+
+class MicrophoneRingBuffer:
+    """
+    Background microphone capture into a fixed-size NumPy ring buffer.
+
+    Positions are absolute frame counts since capture started, so a reader
+    can remember `position` and later ask for everything after it.
+    """
+
+    def __init__(self, robot, seconds: float = MIC_BUFFER_SECONDS):
+        self._robot = robot
+        self.sample_rate = robot.media.get_input_audio_samplerate()
+        if self.sample_rate <= 0:
+            self.sample_rate = 16000
+        self.channels = robot.media.get_input_channels()
+        if self.channels <= 0:
+            self.channels = 1
+
+        self.capacity = int(seconds * self.sample_rate)
+        self._buffer = np.zeros((self.capacity, self.channels), dtype=np.float32)
+        self._written = 0  # Total frames ever written (absolute position)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="mic-ring-buffer", daemon=True
+        )
+
+    @property
+    def position(self) -> int:
+        """Absolute frame index of the next frame to be written."""
+        with self._lock:
+            return self._written
+
+    def start(self):
+        """Open the microphone once and start filling the buffer."""
+        self._robot.media.start_recording()
+        self._thread.start()
+
+    def stop(self):
+        """Stop capture and release the microphone."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        try:
+            self._robot.media.stop_recording()
+        except Exception:
+            pass  # Best effort on shutdown
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sample = self._robot.media.get_audio_sample()
+            except Exception:
+                sample = None
+            if sample is None or len(sample) == 0:
+                time.sleep(0.01)
+                continue
+            self._write(sample)
+
+    def _write(self, sample):
+        """Append a chunk, normalising to float32 (frames, channels)."""
+        chunk = np.asarray(sample)
+        if chunk.dtype == np.int16:
+            chunk = chunk.astype(np.float32) / 32768.0
+        else:
+            chunk = chunk.astype(np.float32, copy=False)
+        if chunk.ndim == 1:
+            chunk = chunk.reshape(-1, 1)
+        if chunk.shape[1] != self.channels:
+            # Channel layout changed under us - downmix and spread
+            chunk = np.repeat(chunk.mean(axis=1, keepdims=True), self.channels, axis=1)
+
+        n = len(chunk)
+        if n > self.capacity:
+            chunk = chunk[-self.capacity:]
+            skipped = n - self.capacity
+            n = self.capacity
+        else:
+            skipped = 0
+
+        with self._lock:
+            start = (self._written + skipped) % self.capacity
+            first = min(n, self.capacity - start)
+            self._buffer[start:start + first] = chunk[:first]
+            if first < n:
+                self._buffer[:n - first] = chunk[first:]
+            self._written += skipped + n
+
+    def read(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """
+        Copy frames [start, end) out of the buffer.
+
+        Positions older than the buffer capacity are clipped to the oldest
+        frame still held. `end` defaults to the current write position.
+        """
+        with self._lock:
+            written = self._written
+            end = written if end is None else min(end, written)
+            start = max(start, written - self.capacity, 0)
+            n = max(0, end - start)
+            out = np.empty((n, self.channels), dtype=np.float32)
+            if n:
+                s = start % self.capacity
+                first = min(n, self.capacity - s)
+                out[:first] = self._buffer[s:s + first]
+                if first < n:
+                    out[first:] = self._buffer[:n - first]
+        return out
+
+    def latest(self, seconds: float) -> np.ndarray:
+        """Copy the most recent `seconds` of audio."""
+        end = self.position
+        return self.read(end - int(seconds * self.sample_rate), end)
+
+    def level_db(self, seconds: float = 0.1) -> float:
+        """RMS level of the most recent audio in dBFS (-120 when silent)."""
+        audio = self.latest(seconds)
+        if audio.size == 0:
+            return -120.0
+        rms = float(np.sqrt(np.mean(np.square(audio))))
+        return 20 * math.log10(rms) if rms > 1e-6 else -120.0
+
+
+_mic_buffer: Optional[MicrophoneRingBuffer] = None
+
+
+def get_mic_buffer() -> MicrophoneRingBuffer:
+    """
+    Get or start the shared microphone ring buffer.
+    Lazily started on first use, like the robot connection.
+    """
+    global _mic_buffer
+    with _init_lock:
+        if _mic_buffer is None:
+            buffer = MicrophoneRingBuffer(get_robot())
+            buffer.start()
+            _mic_buffer = buffer
+        return _mic_buffer
+
+
+def start_mic_buffer():
+    """Start capture at server startup so the first listen() has pre-roll."""
+    import sys
+
+    try:
+        get_mic_buffer()
+    except Exception as e:
+        print(f"Microphone buffer not started (will retry on listen): {e}", file=sys.stderr)
+
+
+def cleanup_mic_buffer():
+    """Stop background capture on shutdown."""
+    global _mic_buffer
+    if _mic_buffer is not None:
+        _mic_buffer.stop()
+        _mic_buffer = None
+
+
+# ==============================================================================
+# VISION
+# ==============================================================================
+# Local perception on camera frames so the LLM gets a few hundred bytes of
+# structured detections instead of a full image. Detection runs on a
+# downscaled grayscale copy; boxes are reported in full-frame pixels.
+
+CAMERA_HFOV = float(os.environ.get("REACHY_CAMERA_HFOV", "100"))  # Degrees
+VISION_WIDTH = 320  # Detection resolution (width in pixels)
+CROP_MAX_SIDE = 96
+
+# OpenCV detectors are not safe to call from two threads at once. The shared
+# instances below are only used under the "camera" arbitration (snap,
+# perform); the head tracker thread builds its own.
+_face_detector = None
+_person_detector = None
+_last_motion_gray = None
+
+# Serializes individual frame grabs. The tracker reads frames for minutes
+# outside the "camera" arbitration, so it and snap() share the camera one
+# grab at a time rather than one holding it for a whole session.
+_camera_lock = threading.Lock()
+
+
+def _new_face_detector():
+    """Load OpenCV's frontal face Haar cascade."""
+    import cv2
+    return cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+
+def _new_person_detector():
+    """Create OpenCV's HOG pedestrian detector."""
+    import cv2
+    detector = cv2.HOGDescriptor()
+    detector.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+    return detector
+
+
+def _get_face_detector():
+    """Shared face detector for camera-arbitrated calls, loaded lazily."""
+    global _face_detector
+    with _init_lock:
+        if _face_detector is None:
+            _face_detector = _new_face_detector()
+        return _face_detector
+
+
+def _get_person_detector():
+    """Shared person detector for camera-arbitrated calls, created lazily."""
+    global _person_detector
+    with _init_lock:
+        if _person_detector is None:
+            _person_detector = _new_person_detector()
+        return _person_detector
+
+
+def capture_frame(robot) -> Optional[np.ndarray]:
+    """Grab one camera frame, one caller at a time."""
+    with _camera_lock:
+        return robot.media.get_frame()
+
+
+def pixel_to_head_angles(x: float, y: float, width: int, height: int) -> tuple[float, float]:
+    """
+    Convert a pixel position to a (yaw, pitch) offset in degrees.
+
+    Angles are in the SDK head frame used by create_head_pose (x forward,
+    y left, z up; scipy "xyz" Euler): positive yaw turns the head left,
+    positive pitch tips the nose down. Adding the offset to the current
+    head yaw/pitch points the head at the pixel. Pinhole model with
+    CAMERA_HFOV.
+    """
+    focal = (width / 2) / math.tan(math.radians(CAMERA_HFOV / 2))
+    # Ray through the pixel in the head frame (image x grows right, y grows down)
+    forward = focal
+    left = width / 2 - x
+    up = height / 2 - y
+    yaw = math.degrees(math.atan2(left, forward))
+    pitch = math.degrees(math.atan2(-up, math.hypot(forward, left)))
+    return yaw, pitch
+
+
+def _downscale_gray(frame: np.ndarray) -> tuple[np.ndarray, float]:
+    """Grayscale copy at VISION_WIDTH, plus the factor back to full size."""
+    import cv2
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    scale = frame.shape[1] / VISION_WIDTH if frame.shape[1] > VISION_WIDTH else 1.0
+    if scale > 1.0:
+        gray = cv2.resize(
+            gray, (VISION_WIDTH, int(round(frame.shape[0] / scale))),
+            interpolation=cv2.INTER_AREA
+        )
+    return gray, scale
+
+
+def detect_faces(gray: np.ndarray, scale: float = 1.0, detector=None) -> list[list[int]]:
+    """Face boxes [x, y, w, h] in full-frame pixels, largest first."""
+    faces = (detector or _get_face_detector()).detectMultiScale(
+        gray, scaleFactor=1.1, minNeighbors=5, minSize=(20, 20)
+    )
+    boxes = [[int(round(v * scale)) for v in box] for box in faces]
+    return sorted(boxes, key=lambda b: b[2] * b[3], reverse=True)
+
+
+def current_head_angles(robot) -> Optional[tuple[float, float]]:
+    """Current head (yaw, pitch) in degrees, SDK signs. None if unreadable."""
+    try:
+        from scipy.spatial.transform import Rotation
+        pose = robot.get_current_head_pose()
+        _, pitch, yaw = Rotation.from_matrix(pose[:3, :3]).as_euler("xyz", degrees=True)
+        return float(yaw), float(pitch)
+    except Exception:
+        return None
+
+
+def _detection(box: list[int], width: int, height: int, head: tuple[float, float]) -> dict:
+    """Box plus the absolute look() yaw/pitch that would centre it."""
+    x, y, w, h = box
+    yaw, pitch = pixel_to_head_angles(x + w / 2, y + h / 2, width, height)
+    return {"box": box, "yaw": round(head[0] + yaw, 1), "pitch": round(head[1] + pitch, 1)}
+
+
+@traced_stage("analyze")
+def analyze_frame(
+    frame: np.ndarray,
+    people: bool = False,
+    head: Optional[tuple[float, float]] = None
+) -> dict:
+    """
+    Summarize a BGR frame: faces, optional people, motion and brightness.
+
+    Detection yaw/pitch are absolute look() angles: the head pose the frame
+    was taken at (`head`, reported as "head") plus each target's offset.
+    Without a known pose ("head": null) neutral is assumed, so they are
+    offsets from the current gaze.
+
+    Motion is the fraction of pixels that changed noticeably since the
+    previous analyzed frame (0 for the first frame).
+    """
+    import cv2
+
+    global _last_motion_gray
+
+    height, width = frame.shape[:2]
+    gray, scale = _downscale_gray(frame)
+
+    faces = detect_faces(gray, scale)
+    summary = {
+        "w": width,
+        "h": height,
+        "brightness": round(float(gray.mean()) / 255, 2),
+        "motion": 0.0,
+        "head": [round(head[0], 1), round(head[1], 1)] if head else None,
+        "faces": [_detection(box, width, height, head or (0.0, 0.0)) for box in faces],
+    }
+
+    if people:
+        rects, _ = _get_person_detector().detectMultiScale(gray, winStride=(8, 8))
+        boxes = [[int(round(v * scale)) for v in box] for box in rects]
+        boxes.sort(key=lambda b: b[2] * b[3], reverse=True)
+        summary["people"] = [_detection(box, width, height, head or (0.0, 0.0)) for box in boxes]
+
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    previous = _last_motion_gray
+    if previous is not None and previous.shape == blurred.shape:
+        diff = cv2.absdiff(blurred, previous)
+        summary["motion"] = round(float(np.count_nonzero(diff > 25)) / diff.size, 3)
+    _last_motion_gray = blurred
+
+    return summary
+
+
+def _encode_crop(frame: np.ndarray, box: list[int]) -> bytes:
+    """Small JPEG crop of a box (longest side CROP_MAX_SIDE)."""
+    import cv2
+
+    x, y, w, h = box
+    crop = frame[max(0, y):y + h, max(0, x):x + w]
+    factor = CROP_MAX_SIDE / max(crop.shape[:2])
+    if factor < 1:
+        crop = cv2.resize(crop, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+    _, buffer = cv2.imencode('.jpg', crop, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return buffer.tobytes()
+
+
+# ==============================================================================
+# FRAME STORE
+# ==============================================================================
+# Recent captures stay on the server under reachy://frames/{id} so agents
+# can re-fetch (optionally resized) or compare frames by URI instead of
+# carrying image bytes through every turn.
+
+FRAME_STORE_SIZE = int(os.environ.get("REACHY_FRAME_STORE_SIZE", "16"))
+JPEG_QUALITY = 85
+
+
+class FrameStore:
+    """
+    Fixed-size LRU of camera frames keyed by increasing id.
+
+    Reading a frame (get/jpeg, including via its resource URI) keeps it
+    alive; the least recently captured-or-read frame is evicted first.
+    """
+
+    def __init__(self, size: int = FRAME_STORE_SIZE):
+        from collections import OrderedDict
+
+        self.size = max(1, size)
+        self._frames: "OrderedDict[str, dict]" = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def add(self, frame: np.ndarray) -> str:
+        """Store a frame and return its id."""
+        with self._lock:
+            frame_id = str(self._next_id)
+            self._next_id += 1
+            self._frames[frame_id] = {"frame": frame, "time": time.time(), "jpeg": {}}
+            while len(self._frames) > self.size:
+                self._frames.popitem(last=False)
+        return frame_id
+
+    def _touch(self, frame_id: str) -> Optional[dict]:
+        """Look up a frame and mark it most recently used."""
+        with self._lock:
+            entry = self._frames.get(frame_id)
+            if entry is not None:
+                self._frames.move_to_end(frame_id)
+            return entry
+
+    def get(self, frame_id: str) -> Optional[np.ndarray]:
+        entry = self._touch(frame_id)
+        return entry["frame"] if entry else None
+
+    def jpeg(self, frame_id: str, width: int = 0) -> Optional[bytes]:
+        """Encoded JPEG of a stored frame, cached per requested width."""
+        entry = self._touch(frame_id)
+        if entry is None:
+            return None
+        cached = entry["jpeg"].get(width)
+        if cached is None:
+            cached = encode_jpeg(entry["frame"], width)
+            entry["jpeg"][width] = cached
+        return cached
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "id": frame_id,
+                    "uri": frame_uri(frame_id),
+                    "time": round(entry["time"], 3),
+                    "w": entry["frame"].shape[1],
+                    "h": entry["frame"].shape[0],
+                }
+                for frame_id, entry in self._frames.items()
+            ]
+
+
+_frame_store = FrameStore()
+
+
+def frame_uri(frame_id: str, width: int = 0) -> str:
+    return f"reachy://frames/{frame_id}/{width}" if width else f"reachy://frames/{frame_id}"
+
+
+@mcp.resource("reachy://frames", mime_type="application/json")
+def list_frames() -> str:
+    """Recent camera frames held by the server (newest last)."""
+    import json
+    return json.dumps(_frame_store.list(), separators=(",", ":"))
+
+
+@mcp.resource("reachy://frames/{frame_id}", mime_type="image/jpeg")
+def get_frame(frame_id: str) -> bytes:
+    """A stored camera frame as JPEG at capture resolution."""
+    data = _frame_store.jpeg(frame_id)
+    if data is None:
+        raise ValueError(f"Frame {frame_id} is no longer stored")
+    return data
+
+
+@mcp.resource("reachy://frames/{frame_id}/{width}", mime_type="image/jpeg")
+def get_frame_resized(frame_id: str, width: int) -> bytes:
+    """A stored camera frame as JPEG, downscaled to `width` pixels."""
+    data = _frame_store.jpeg(frame_id, max(16, int(width)))
+    if data is None:
+        raise ValueError(f"Frame {frame_id} is no longer stored")
+    return data
+
+
+# ==============================================================================
+# MEDIA WORKERS
+# ==============================================================================
+# CPU-heavy media work (JPEG encode, WAV packing) runs
+# in a process pool so it spreads across cores and never holds the GIL the
+# motion threads (move streaming, tracking, mic capture) depend on. Large
+# arrays travel through shared memory instead of the pool's pipe.
+# REACHY_MEDIA_WORKERS=0 keeps everything in-process.
+
+MEDIA_WORKERS = int(os.environ.get("REACHY_MEDIA_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+MEDIA_OFFLOAD_MIN_BYTES = 64 * 1024  # Smaller jobs are cheaper inline
+
+_media_pool = None
+
+
+def _start_media_pool():
+    """
+    Spawn MEDIA_WORKERS workers that load only the media_jobs module.
+
+    spawn re-runs the launching script (server.py or the console script,
+    which imports it) in every child unless __main__ has no file, so it is
+    hidden while the workers start. Jobs unpickle from media_jobs alone.
+    """
+    import multiprocessing
+    import sys
+    import types
+    from concurrent.futures import ProcessPoolExecutor
+
+    # spawn: never fork a process that owns SDK and capture threads
+    pool = ProcessPoolExecutor(
+        max_workers=MEDIA_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        # One job per worker: the pool only spawns a process when none is idle
+        for _ in range(MEDIA_WORKERS):
+            pool.submit(media_jobs.warm_up)
+    finally:
+        sys.modules["__main__"] = main
+    return pool
+
+
+def get_media_pool():
+    """Get or start the media process pool (None when disabled)."""
+    global _media_pool
+    with _init_lock:
+        if _media_pool is None and MEDIA_WORKERS > 0:
+            _media_pool = _start_media_pool()
+        return _media_pool
+
+
+def _drop_media_pool(pool):
+    """Discard a broken pool; the next get_media_pool() starts a fresh one."""
+    import sys
+
+    global _media_pool
+    with _init_lock:
+        if _media_pool is pool:
+            _media_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+    print("Media worker died - restarting the pool, encoding inline meanwhile", file=sys.stderr)
+
+
+def cleanup_media_pool():
+    """Shut the pool down on exit."""
+    global _media_pool
+    if _media_pool is not None:
+        _media_pool.shutdown(wait=False, cancel_futures=True)
+        _media_pool = None
+
+
+def _to_shared(array: np.ndarray):
+    """Copy an array into a new shared memory block. Returns (shm, descriptor)."""
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _run_shared(job, array: np.ndarray, *args) -> Optional[bytes]:
+    """
+    Run `job` on `array` in the pool via shared memory. None = do it inline.
+
+    A dead worker (OOM, a native crash) breaks the whole pool; it is then
+    dropped so later calls get a fresh one instead of failing forever.
+    """
+    from concurrent.futures.process import BrokenProcessPool
+
+    pool = get_media_pool()
+    if pool is None or array.nbytes < MEDIA_OFFLOAD_MIN_BYTES:
+        return None
+    shm, descriptor = _to_shared(array)
+    try:
+        return pool.submit(job, descriptor, *args).result()
+    except BrokenProcessPool:
+        _drop_media_pool(pool)
+        return None
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+@traced_stage("encode")
+def encode_jpeg(frame: np.ndarray, width: int = 0, quality: int = JPEG_QUALITY) -> bytes:
+    """JPEG-encode a frame, in the media pool when worthwhile."""
+    data = _run_shared(media_jobs.jpeg_job, frame, width, quality)
+    return data if data is not None else media_jobs.encode_jpeg(frame, width, quality)
+
+
+@traced_stage("encode")
+def encode_wav(audio: np.ndarray, sample_rate: int, channels: int) -> bytes:
+    """Pack audio as 16-bit WAV, in the media pool when worthwhile."""
+    data = _run_shared(media_jobs.wav_job, audio, sample_rate, channels)
+    return data if data is not None else media_jobs.encode_wav(audio, sample_rate, channels)
+
+
+def decode_base64_chunks(chunks: list[str]) -> bytes:
+    """
+    Decode and join base64 audio chunks.
+
+    Stays inline: base64 decoding runs in C at memory speed, so pickling the
+    text to a worker would cost more than the decode itself.
+    """
+    return b"".join(base64.b64decode(chunk) for chunk in chunks)
+
+
 # ==============================================================================
 # MCP TOOLS
 # ==============================================================================
 
+@traced_stage("motion")
 def _do_express(emotion: str) -> str:
     """Internal helper - execute an emotion expression."""
     if emotion not in EXPRESSIONS:
@@ -219,6 +1354,8 @@ def _do_express(emotion: str) -> str:
     robot = get_robot()
 
     try:
+        stop_local_move()
+        _hold_tracking(expr["duration"])
         head = expr["head"]
         antennas = expr["antennas"]
 
@@ -255,6 +1392,8 @@ def _do_move(name: str) -> str:
 
 
 @mcp.tool()
+@arbitrated({"motors"})
+@traced
 def show(
     emotion: Literal[
         "neutral", "curious", "uncertain", "recognition", "joy",
@@ -276,6 +1415,7 @@ def show(
 
     Use `move` for 81 recorded emotions from Pollen (e.g., "fear1", "loving1"):
     - More nuanced, professionally choreographed
+    - Streamed from the local move cache when prefetched (works offline)
     - Use list_moves() to see all available
 
     Args:
@@ -290,30 +1430,15 @@ def show(
     return _do_express(emotion)
 
 
-@mcp.tool()
-def look(
+@traced_stage("motion")
+def _do_look(
     roll: float = 0,
     pitch: float = 0,
     yaw: float = 0,
     z: float = 0,
     duration: float = 1.0
 ) -> str:
-    """
-    Direct head positioning in degrees.
-
-    Use for precise control when express() doesn't fit.
-    For most cases, prefer express() for cognitive simplicity.
-
-    Args:
-        roll: Tilt left/right (-45 to 45). Positive = right ear to shoulder
-        pitch: Nod up/down (-30 to 30). Positive = looking up
-        yaw: Turn left/right (-90 to 90). Positive = looking right
-        z: Vertical offset (-20 to 20). Positive = head higher
-        duration: Movement time in seconds (0.1 to 5.0)
-
-    Returns:
-        Confirmation
-    """
+    """Internal helper - clamp and execute a head pose."""
     # Clamp values to safe ranges
     roll = max(-45, min(45, roll))
     pitch = max(-30, min(30, pitch))
@@ -324,6 +1449,8 @@ def look(
     robot = get_robot()
 
     try:
+        stop_local_move()
+        _hold_tracking(duration)
         robot.goto_target(
             head=create_head_pose_array(z=z, roll=roll, pitch=pitch, yaw=yaw),
             duration=duration,
@@ -335,17 +1462,68 @@ def look(
         return f"Movement failed: {e}"
 
 
+@mcp.tool()
+@arbitrated({"motors"})
+@traced
+def look(
+    roll: float = 0,
+    pitch: float = 0,
+    yaw: float = 0,
+    z: float = 0,
+    duration: float = 1.0
+) -> str:
+    """
+    Direct head positioning in degrees.
+
+    Use for precise control when express() doesn't fit.
+    For most cases, prefer express() for cognitive simplicity.
+
+    Args:
+        roll: Tilt left/right (-45 to 45). Positive = right ear to shoulder
+        pitch: Nod up/down (-30 to 30). Positive = nose down
+        yaw: Turn left/right (-90 to 90). Positive = looking left
+        z: Vertical offset (-20 to 20). Positive = head higher
+        duration: Movement time in seconds (0.1 to 5.0)
+
+    Returns:
+        Confirmation
+    """
+    return _do_look(roll, pitch, yaw, z, duration)
+
+
 GROK_VOICES = ["ara", "eve", "leo", "rex", "sal"]
 
+@traced_stage("tts")
 def text_to_speech(text: str, voice: Optional[str] = None) -> str:
     """
     Convert text to speech. Uses Grok Voice if available, falls back to Deepgram.
-    Returns path to temporary audio file.
+    Returns path to temporary audio file (the caller owns and deletes it).
+
+    Concurrent requests for the same phrase and voice share one synthesis;
+    each caller still gets its own file.
     """
+    import tempfile
+
     xai_key = os.environ.get("XAI_API_KEY")
-    if xai_key:
-        return grok_text_to_speech(text, xai_key, voice)
-    return deepgram_text_to_speech(text)
+
+    def synthesize() -> tuple[str, bytes]:
+        if xai_key:
+            path = grok_text_to_speech(text, xai_key, voice)
+        else:
+            path = deepgram_text_to_speech(text)
+        try:
+            with open(path, "rb") as f:
+                return os.path.splitext(path)[1], f.read()
+        finally:
+            os.unlink(path)
+
+    key = ("grok" if xai_key else "deepgram", (voice or "").lower(), text)
+    suffix, audio = _tts_flight.do(key, synthesize)
+
+    temp_file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+    temp_file.write(audio)
+    temp_file.close()
+    return temp_file.name
 
 
 def deepgram_text_to_speech(text: str) -> str:
@@ -357,7 +1535,8 @@ def deepgram_text_to_speech(text: str) -> str:
     if not api_key:
         raise RuntimeError("DEEPGRAM_API_KEY environment variable not set")
 
-    url = "https://api.deepgram.com/v1/speak?model=aura-2-saturn-en"
+    # linear16 WAV: the robot plays it without an MP3 decode step
+    url = "https://api.deepgram.com/v1/speak?model=aura-2-saturn-en&encoding=linear16&container=wav"
     headers = {
         "Authorization": f"Token {api_key}",
         "Content-Type": "application/json"
@@ -368,7 +1547,7 @@ def deepgram_text_to_speech(text: str) -> str:
     response.raise_for_status()
 
     # Save to temp file
-    temp_file = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
+    temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
     temp_file.write(response.content)
     temp_file.close()
 
@@ -456,7 +1635,7 @@ def grok_text_to_speech(text: str, api_key: str, voice: Optional[str] = None) ->
         raise RuntimeError("No audio received from Grok")
 
     # Decode base64 audio chunks and combine
-    pcm_data = b"".join(base64.b64decode(chunk) for chunk in audio_chunks)
+    pcm_data = decode_base64_chunks(audio_chunks)
 
     # Convert PCM to WAV (24kHz 16-bit mono)
     import wave
@@ -470,6 +1649,7 @@ def grok_text_to_speech(text: str, api_key: str, voice: Optional[str] = None) ->
     return temp_file.name
 
 
+@traced_stage("stt")
 def speech_to_text(audio_data: bytes) -> str:
     """
     Convert audio to text using Deepgram STT (Nova-2).
@@ -493,10 +1673,13 @@ def speech_to_text(audio_data: bytes) -> str:
         "Content-Type": "audio/wav"
     }
 
-    response = httpx.post(url, headers=headers, content=audio_data, timeout=30.0)
-    response.raise_for_status()
+    def transcribe() -> dict:
+        response = httpx.post(url, headers=headers, content=audio_data, timeout=30.0)
+        response.raise_for_status()
+        return response.json()
 
-    result = response.json()
+    # Identical audio (e.g. a retried request) is only sent once
+    result = _stt_flight.do(hashlib.blake2b(audio_data, digest_size=16).digest(), transcribe)
 
     # Extract transcript from Deepgram response
     try:
@@ -538,32 +1721,34 @@ def _parse_choreographed_text(text: str) -> list[dict]:
     return segments
 
 
-@mcp.tool()
-def speak(
-    text: str,
-    listen_after: float = 0,
-    voice: Literal["ara", "eve", "leo", "rex", "sal"] = "eve"
-) -> str:
-    """
-    Speak through the robot's speaker.
-
-    Uses text-to-speech to vocalize. Supports embedded move markers
-    for choreographed performances where speech and motion happen together.
-
-    Syntax for embedded moves:
-        "This is amazing [move:enthusiastic1] Jack, wonderful idea [move:grateful1]"
-
-    Moves play concurrently with speech (non-blocking).
-    Use list_moves() to see available move names.
-
-    Args:
-        text: What to say, optionally with [move:name] markers
-        listen_after: Seconds to listen after speaking (0 = don't listen)
-        voice: Grok voice - ara (warm), eve (energetic), leo (authoritative), rex (confident), sal (neutral)
-
-    Returns:
-        Confirmation, plus transcription if listen_after > 0
-    """
+def audio_duration(path: str) -> float:
+    """Length of an audio file in seconds (0 if it cannot be read)."""
+    try:
+        if path.endswith(".wav"):
+            import wave
+            with wave.open(path, "rb") as wav:
+                frame_bytes = wav.getnchannels() * wav.getsampwidth()
+                # Streamed WAVs can carry a placeholder length; trust the file size
+                frames = min(wav.getnframes(), (os.path.getsize(path) - 44) // frame_bytes)
+                return max(0, frames) / wav.getframerate()
+        import soundfile
+        return soundfile.info(path).duration
+    except Exception:
+        return 0.0
+
+
+def _play_to_end(robot, path: str):
+    """Play a sound and return once it has finished, even if play_sound() doesn't block."""
+    duration = audio_duration(path)
+    start = time.monotonic()
+    robot.media.play_sound(path)
+    remaining = duration - (time.monotonic() - start)
+    if remaining > 0:
+        time.sleep(remaining)
+
+
+def _do_speak(text: str, listen_after: float = 0, voice: Optional[str] = None) -> str:
+    """Internal helper - speak (with optional choreography), then optionally listen."""
     robot = get_robot()
 
     result_parts = []
@@ -571,15 +1756,19 @@ def speak(
     try:
         # Check if it's a file path (no choreography support for raw audio)
         if text.endswith(('.wav', '.mp3', '.ogg')):
-            robot.media.play_sound(text)
+            with trace_stage("play"), _speaker_lock:
+                _play_to_end(robot, text)
             result_parts.append(f"Played audio: {text}")
 
         # Check for embedded moves
         elif '[move:' in text:
+            from concurrent.futures import ThreadPoolExecutor
+
             segments = _parse_choreographed_text(text)
             moves_triggered = []
             speech_parts = []
             pending_move = None
+            chunks = []  # (move to fire first, text)
 
             for segment in segments:
                 if segment["type"] == "move":
@@ -588,20 +1777,35 @@ def speak(
                 elif segment["type"] == "text":
                     content = segment["content"].strip()
                     if content:
-                        # Fire pending move and wait for it to complete
-                        if pending_move:
-                            _do_move(pending_move)
-                            _wait_for_moves_complete(timeout=10.0)
-                            moves_triggered.append(pending_move)
-                            pending_move = None
-
-                        # Speak this chunk with proper temp file cleanup
-                        audio_path = text_to_speech(content, voice)
+                        chunks.append((pending_move, content))
+                        pending_move = None
+
+            # Synthesize all chunks at once; each plays as soon as it is ready,
+            # with the speaker held for the whole utterance
+            with ThreadPoolExecutor(max_workers=max(1, len(chunks))) as pool:
+                speech = [
+                    pool.submit(contextvars.copy_context().run, text_to_speech, content, voice)
+                    for _, content in chunks
+                ]
+                try:
+                    with _speaker_lock:
+                        token = _speaker_held.set(True)
                         try:
-                            robot.media.play_sound(audio_path)
+                            for (move, content), clip in zip(chunks, speech):
+                                # Fire the move and wait for it to complete
+                                if move:
+                                    _do_move(move)
+                                    _wait_for_moves_complete(timeout=10.0)
+                                    moves_triggered.append(move)
+                                with trace_stage("play"):
+                                    _play_to_end(robot, clip.result())
+                                speech_parts.append(content)
                         finally:
-                            os.unlink(audio_path)
-                        speech_parts.append(content)
+                            _speaker_held.reset(token)
+                finally:
+                    for clip in speech:
+                        if clip.exception() is None:
+                            os.unlink(clip.result())
 
             # Fire any trailing move (if text ends with a move marker)
             if pending_move:
@@ -614,15 +1818,15 @@ def speak(
             # Simple speech - no choreography
             audio_path = text_to_speech(text, voice)
             try:
-                robot.media.play_sound(audio_path)
+                with trace_stage("play"), _speaker_lock:
+                    _play_to_end(robot, audio_path)
             finally:
                 os.unlink(audio_path)
             result_parts.append(f"Spoke: {text}")
 
         # Listen after speaking if requested
         if listen_after > 0:
-            import time
-            # Wait for audio playback to complete before listening
+            # Playback has finished; wait for any trailing move too
             # This prevents the mic from picking up the robot's own voice
             _wait_for_moves_complete(timeout=30.0)
             time.sleep(0.5)  # Buffer for audio pipeline latency
@@ -639,47 +1843,55 @@ def speak(
         return f"Speech failed: {e}"
 
 
-def _do_listen(duration: float) -> str:
-    """Internal helper - capture and transcribe audio."""
-    import time
-    import io
-    import wave
-    import numpy as np
+@mcp.tool()
+@arbitrated(lambda args: _tool_resources({"action": "speak", **args}))
+@traced
+def speak(
+    text: str,
+    listen_after: float = 0,
+    voice: Literal["ara", "eve", "leo", "rex", "sal"] = "eve"
+) -> str:
+    """
+    Speak through the robot's speaker.
+
+    Uses text-to-speech to vocalize. Supports embedded move markers
+    for choreographed performances where speech and motion happen together.
+
+    Syntax for embedded moves:
+        "This is amazing [move:enthusiastic1] Jack, wonderful idea [move:grateful1]"
 
+    Moves play concurrently with speech (non-blocking).
+    Use list_moves() to see available move names.
+
+    Args:
+        text: What to say, optionally with [move:name] markers
+        listen_after: Seconds to listen after speaking (0 = don't listen)
+        voice: Grok voice - ara (warm), eve (energetic), leo (authoritative), rex (confident), sal (neutral)
+
+    Returns:
+        Confirmation, plus transcription if listen_after > 0
+    """
+    return _do_speak(text, listen_after, voice)
+
+
+def _do_listen(duration: float, pre_roll: float = 0) -> str:
+    """
+    Internal helper - capture and transcribe audio.
+
+    Reads from the always-on microphone ring buffer, so capture starts
+    instantly and `pre_roll` seconds said just before the call are included.
+    """
     duration = max(1, min(30, duration))
-    robot = get_robot()
+    pre_roll = max(0, min(MIC_BUFFER_SECONDS - duration, pre_roll))
+    mic = get_mic_buffer()
 
-    # Record with proper cleanup
-    robot.media.start_recording()
-    try:
+    start = mic.position - int(pre_roll * mic.sample_rate)
+    with trace_stage("record"):
         time.sleep(duration)
-        audio_data = robot.media.get_audio_sample()
-    finally:
-        robot.media.stop_recording()
-
-    if audio_data is not None and len(audio_data) > 0:
-        # Convert numpy array to WAV bytes for Deepgram
-        sample_rate = robot.media.get_input_audio_samplerate()
-        channels = robot.media.get_input_channels()
-
-        # Create WAV file in memory
-        wav_buffer = io.BytesIO()
-        with wave.open(wav_buffer, 'wb') as wav_file:
-            wav_file.setnchannels(channels if channels > 0 else 1)
-            wav_file.setsampwidth(2)  # 16-bit
-            wav_file.setframerate(sample_rate if sample_rate > 0 else 16000)
-
-            # Convert float32 to int16
-            if isinstance(audio_data, np.ndarray):
-                if audio_data.dtype == np.float32:
-                    audio_int16 = (audio_data * 32767).astype(np.int16)
-                else:
-                    audio_int16 = audio_data.astype(np.int16)
-                wav_file.writeframes(audio_int16.tobytes())
-            else:
-                wav_file.writeframes(audio_data)
+    audio_data = mic.read(start)
 
-        wav_bytes = wav_buffer.getvalue()
+    if len(audio_data) > 0:
+        wav_bytes = encode_wav(audio_data, mic.sample_rate, mic.channels)
 
         # Transcribe via Deepgram STT
         transcript = speech_to_text(wav_bytes)
@@ -689,21 +1901,26 @@ def _do_listen(duration: float) -> str:
 
 
 @mcp.tool()
-def listen(duration: float = 3.0) -> str:
+@arbitrated(set())  # Reads the shared ring buffer - no exclusive hold
+@traced
+def listen(duration: float = 3.0, pre_roll: float = LISTEN_PRE_ROLL) -> str:
     """
     Listen through the robot's microphones and transcribe.
 
     Captures audio for the specified duration and converts to text
-    using Deepgram Nova-2 speech-to-text.
+    using Deepgram Nova-2 speech-to-text. The microphone is always
+    buffering, so speech that started just before the call is kept.
 
     Args:
         duration: How long to listen in seconds (1-30)
+        pre_roll: Seconds of already-buffered audio to include (default 0).
+            Keep 0 right after speak() - the buffer still holds the robot's voice
 
     Returns:
         Transcribed text of what was heard
     """
     try:
-        transcript = _do_listen(duration)
+        transcript = _do_listen(duration, pre_roll)
         if transcript:
             return f"Heard: {transcript}"
         else:
@@ -712,30 +1929,49 @@ def listen(duration: float = 3.0) -> str:
         return f"Listen failed: {e}"
 
 
-@mcp.tool()
-def snap() -> str:
+def _do_snap(
+    mode: str = "image",
+    crop: bool = False,
+    people: bool = False,
+    width: int = 0,
+    inline: bool = True
+):
     """
-    Capture an image from the robot's camera.
+    Internal helper - capture a frame into the frame store.
 
-    Returns the current view as base64-encoded image.
-    Use this to perceive the environment.
-
-    Returns:
-        Base64-encoded image data (JPEG)
+    mode="image" returns [Image, caption] MCP content; mode="summary"
+    returns compact JSON detections (plus a crop Image if asked).
+    With inline=False only text is returned, referencing the frame URI.
     """
+    import json
+    from fastmcp.utilities.types import Image
+
     robot = get_robot()
 
     try:
-        frame = robot.media.get_frame()
+        with trace_stage("capture"):
+            frame = capture_frame(robot)
 
-        if frame is not None:
-            import cv2
-            _, buffer = cv2.imencode('.jpg', frame)
-            encoded = base64.b64encode(buffer).decode('utf-8')
-            return f"data:image/jpeg;base64,{encoded}"
-        else:
+        if frame is None:
             return "No frame captured"
 
+        frame_id = _frame_store.add(frame)
+        height, frame_width = frame.shape[:2]
+
+        if mode == "summary":
+            summary = analyze_frame(frame, people=people, head=current_head_angles(robot))
+            summary["uri"] = frame_uri(frame_id)
+            text = json.dumps(summary, separators=(",", ":"))
+            subjects = summary["faces"] or summary.get("people", [])
+            if crop and subjects and inline:
+                return [text, Image(data=_encode_crop(frame, subjects[0]["box"]), format="jpeg")]
+            return text
+
+        caption = f"Frame {frame_uri(frame_id)} ({frame_width}x{height})"
+        if not inline:
+            return caption
+        return [Image(data=_frame_store.jpeg(frame_id, width), format="jpeg"), caption]
+
     except ImportError:
         return "OpenCV not available for image encoding"
     except Exception as e:
@@ -743,25 +1979,54 @@ def snap() -> str:
 
 
 @mcp.tool()
-def rest(mode: Literal["neutral", "sleep", "wake"] = "neutral") -> str:
+@arbitrated({"camera"})
+@traced
+def snap(
+    mode: Literal["image", "summary"] = "image",
+    crop: bool = False,
+    people: bool = False,
+    width: int = 0
+):
     """
-    Control robot rest state.
+    Capture an image from the robot's camera.
+
+    Use this to perceive the environment. Every capture is kept on the
+    server as reachy://frames/{id} (re-fetch it, or reachy://frames/{id}/{width}
+    for a resized copy, without capturing again).
+
+    mode="summary" analyzes the frame on the robot and returns a few
+    hundred bytes of JSON instead of an image - much cheaper when you
+    only need to find a face:
+        {"w":640,"h":480,"brightness":0.42,"motion":0.03,
+         "head":[0.0,0.0],"faces":[{"box":[x,y,w,h],"yaw":-12.3,"pitch":4.1}],
+         "uri":"reachy://frames/7"}
+    Face yaw/pitch are absolute look() angles (head pose + offset) - pass
+    them to look() to face it. If "head" is null the pose was unreadable
+    and they are offsets from the current gaze.
 
     Args:
-        mode:
-            - "neutral": Return to neutral pose (default)
-            - "sleep": Enter sleep mode (low power)
-            - "wake": Wake from sleep mode
+        mode: "image" for the full frame, "summary" for detections only
+        crop: With summary, attach a small JPEG crop of the largest face/person
+        people: With summary, also detect full-body people (slower)
+        width: With image, downscale to this width in pixels (0 = full size)
 
     Returns:
-        Confirmation
+        JPEG image plus its frame URI, or JSON summary
     """
+    return _do_snap(mode, crop, people, width)
+
+
+def _do_rest(mode: str = "neutral") -> str:
+    """Internal helper - change rest state."""
     robot = get_robot()
     try:
         if mode == "sleep":
+            stop_tracking()
+            stop_local_move()
             robot.goto_sleep()
             return "Robot sleeping"
         elif mode == "wake":
+            stop_local_move()
             robot.wake_up()
             return "Robot awakened"
         else:  # neutral
@@ -770,30 +2035,58 @@ def rest(mode: Literal["neutral", "sleep", "wake"] = "neutral") -> str:
         return f"Rest failed: {e}"
 
 
+@mcp.tool()
+@arbitrated({"motors"})
+@traced
+def rest(mode: Literal["neutral", "sleep", "wake"] = "neutral") -> str:
+    """
+    Control robot rest state.
+
+    Args:
+        mode:
+            - "neutral": Return to neutral pose (default)
+            - "sleep": Enter sleep mode (low power)
+            - "wake": Wake from sleep mode
+
+    Returns:
+        Confirmation
+    """
+    return _do_rest(mode)
+
+
 # ==============================================================================
 # RECORDED MOVES (Pollen's emotion/dance libraries)
 # ==============================================================================
 
 DAEMON_URL = os.environ.get("REACHY_DAEMON_URL", "http://localhost:8321/api")
+DAEMON_MOVE_HOLD = 5.0  # Seconds tracking pauses for a daemon-played move (duration unknown)
 
 
+@traced_stage("wait")
 def _wait_for_moves_complete(timeout: float = 30.0, poll_interval: float = 0.1) -> bool:
     """
     Wait for all moves to complete by polling the daemon.
 
+    Locally streamed moves (see MoveStore) are waited on first.
     Returns True if moves completed, False if timeout.
     """
-    import time
     import httpx
 
     start = time.time()
+    since = time.monotonic()
+    if not _wait_for_local_move(timeout):
+        return False
+    def poll_running():
+        response = httpx.get(f"{DAEMON_URL}/move/running", timeout=2.0)
+        return response.json() if response.status_code == 200 else None
+
     while time.time() - start < timeout:
         try:
-            response = httpx.get(f"{DAEMON_URL}/move/running", timeout=2.0)
-            if response.status_code == 200:
-                running = response.json()
-                if not running:  # Empty list = all moves done
-                    return True
+            # Concurrent waiters share a poll, but only one sent after this
+            # waiter started - an older one could predate its move
+            running = _daemon_flight.do("running", poll_running, not_before=since)
+            if running is not None and not running:  # Empty list = all moves done
+                return True
         except (httpx.RequestError, httpx.TimeoutException):
             pass  # Connection error, keep polling
         time.sleep(poll_interval)
@@ -806,7 +2099,327 @@ MOVE_LIBRARIES = {
 }
 
 
+# ------------------------------------------------------------------------------
+# Local move store
+# ------------------------------------------------------------------------------
+# Recorded moves are prefetched from HuggingFace once and kept on disk as one
+# float64 .npy per move, memory-mapped on demand. Row layout:
+#   [t, head (4x4 row-major, 16 values), antenna_left, antenna_right, body_yaw]
+# Playback streams the trajectory through the SDK instead of the daemon.
+
+MOVE_CACHE_DIR = os.path.expanduser(
+    os.environ.get("REACHY_MOVE_CACHE", "~/.cache/reachy-mini-mcp/moves")
+)
+MOVE_PREFETCH = os.environ.get("REACHY_MOVE_PREFETCH", "emotions,dances")
+MOVE_PLAY_HZ = 100
+MOVE_LEAD_IN = 0.5  # Seconds to glide to the first frame before streaming
+
+_TRAJ_TIME = 0
+_TRAJ_HEAD = slice(1, 17)
+_TRAJ_ANTENNAS = slice(17, 19)
+_TRAJ_BODY_YAW = 19
+_TRAJ_COLUMNS = 20
+
+
+class MoveStore:
+    """
+    On-disk cache of Pollen recorded moves.
+
+    Each library directory holds `index.json` (name -> duration, frames,
+    description, sound) plus `<name>.npy` trajectories and `<name>.wav`
+    sounds for moves that have them.
+    """
+
+    def __init__(self, root: str = MOVE_CACHE_DIR):
+        self.root = root
+        self._index: dict[str, dict] = {}
+        self._arrays: dict[tuple[str, str], np.ndarray] = {}
+        self._lock = threading.Lock()
+        for library in MOVE_LIBRARIES:
+            self._index[library] = self._load_index(library)
+
+    def _library_dir(self, library: str) -> str:
+        return os.path.join(self.root, library)
+
+    def _load_index(self, library: str) -> dict:
+        import json
+
+        path = os.path.join(self._library_dir(library), "index.json")
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def has_library(self, library: str) -> bool:
+        return bool(self._index.get(library))
+
+    def list_moves(self, library: str) -> list[str]:
+        return sorted(self._index.get(library, {}))
+
+    def lookup(self, name: str, library: str = "emotions") -> Optional[tuple[str, dict]]:
+        """Find a cached move, preferring `library`. Returns (library, entry)."""
+        if name in self._index.get(library, {}):
+            return library, self._index[library][name]
+        for other, moves in self._index.items():
+            if name in moves:
+                return other, moves[name]
+        return None
+
+    def duration(self, name: str, library: str = "emotions") -> Optional[float]:
+        """Duration of a cached move in seconds, None if not cached."""
+        found = self.lookup(name, library)
+        return found[1]["duration"] if found else None
+
+    def trajectory(self, library: str, name: str) -> np.ndarray:
+        """Memory-mapped (frames, 20) trajectory array."""
+        key = (library, name)
+        with self._lock:
+            if key not in self._arrays:
+                path = os.path.join(self._library_dir(library), f"{name}.npy")
+                self._arrays[key] = np.load(path, mmap_mode="r")
+            return self._arrays[key]
+
+    def sound_path(self, library: str, name: str) -> Optional[str]:
+        entry = self._index.get(library, {}).get(name, {})
+        if not entry.get("sound"):
+            return None
+        return os.path.join(self._library_dir(library), f"{name}.wav")
+
+    def prefetch(self, library: str) -> int:
+        """
+        Download a library and convert every move to the on-disk format.
+
+        Malformed moves are skipped and logged; the rest are still stored.
+        Returns the number of moves stored.
+        """
+        import json
+        import shutil
+        import sys
+        from reachy_mini.motion.recorded_move import RecordedMoves
+
+        dataset = MOVE_LIBRARIES[library]
+        moves = RecordedMoves(dataset)
+        directory = self._library_dir(library)
+        os.makedirs(directory, exist_ok=True)
+
+        index = {}
+        for name in moves.list_moves():
+            try:
+                move = moves.get(name)
+                rows = _move_to_rows(move)
+            except Exception as e:
+                print(f"Skipping {library} move {name}: {e}", file=sys.stderr)
+                continue
+
+            tmp_path = os.path.join(directory, f".{name}.tmp.npy")
+            np.save(tmp_path, rows)
+            os.replace(tmp_path, os.path.join(directory, f"{name}.npy"))
+
+            sound = getattr(move, "sound_path", None)
+            has_sound = bool(sound and os.path.exists(sound))
+            if has_sound:
+                shutil.copyfile(sound, os.path.join(directory, f"{name}.wav"))
+
+            index[name] = {
+                "duration": float(rows[-1, _TRAJ_TIME]),
+                "frames": len(rows),
+                "description": getattr(move, "description", ""),
+                "sound": has_sound,
+            }
+
+        tmp_index = os.path.join(directory, ".index.tmp.json")
+        with open(tmp_index, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_index, os.path.join(directory, "index.json"))
+
+        with self._lock:
+            self._index[library] = index
+            self._arrays = {k: v for k, v in self._arrays.items() if k[0] != library}
+        return len(index)
+
+
+def _move_to_rows(move) -> np.ndarray:
+    """Convert a recorded move to a (frames, 20) trajectory array."""
+    times = np.asarray(move.timestamps, dtype=np.float64)
+    trajectory = list(move.trajectory)
+    if len(times) == 0:
+        raise ValueError("no timestamps")
+    if len(trajectory) != len(times):
+        raise ValueError(f"{len(trajectory)} frames for {len(times)} timestamps")
+
+    rows = np.zeros((len(times), _TRAJ_COLUMNS), dtype=np.float64)
+    rows[:, _TRAJ_TIME] = times - times[0]
+    for i, frame in enumerate(trajectory):
+        rows[i, _TRAJ_HEAD] = np.asarray(frame["head"], dtype=np.float64).reshape(16)
+        rows[i, _TRAJ_ANTENNAS] = frame["antennas"]
+        rows[i, _TRAJ_BODY_YAW] = frame.get("body_yaw", 0.0)
+    return rows
+
+
+_move_store: Optional[MoveStore] = None
+
+
+def get_move_store() -> MoveStore:
+    """Get or load the local move store (reads indexes only, no download)."""
+    global _move_store
+    with _init_lock:
+        if _move_store is None:
+            _move_store = MoveStore()
+        return _move_store
+
+
+def prefetch_moves(libraries: Optional[list[str]] = None):
+    """Prefetch libraries that are not cached yet. Errors are non-fatal."""
+    import sys
+
+    store = get_move_store()
+    if libraries is None:
+        libraries = [lib.strip() for lib in MOVE_PREFETCH.split(",") if lib.strip()]
+    for library in libraries:
+        if library not in MOVE_LIBRARIES or store.has_library(library):
+            continue
+        try:
+            count = store.prefetch(library)
+            print(f"Cached {count} {library} moves in {store.root}", file=sys.stderr)
+        except Exception as e:
+            print(f"Move prefetch failed for {library}: {e}", file=sys.stderr)
+
+
+_local_move_thread = None
+_local_move_stop = None
+
+
+def _stream_trajectory(robot, rows: np.ndarray, sound_path: Optional[str], stop, take_speaker: bool = True):
+    """
+    Glide to the first frame, then stream the trajectory at MOVE_PLAY_HZ.
+
+    The move's sound holds _speaker_lock while it plays (unless the caller
+    already owns the speaker); if someone else is speaking the move plays
+    silently rather than talking over them.
+    """
+    from reachy_mini.utils.interpolation import linear_pose_interpolation
+
+    times = rows[:, _TRAJ_TIME]
+    first = rows[0]
+    robot.goto_target(
+        head=first[_TRAJ_HEAD].reshape(4, 4),
+        antennas=list(first[_TRAJ_ANTENNAS]),
+        body_yaw=float(first[_TRAJ_BODY_YAW]),
+        duration=MOVE_LEAD_IN,
+        method=get_interpolation_method("minjerk")
+    )
+    speaker_until = None  # When to release _speaker_lock, if we took it
+    if sound_path and (not take_speaker or _speaker_lock.acquire(blocking=False)):
+        if take_speaker:
+            speaker_until = time.monotonic() + audio_duration(sound_path)
+        try:
+            robot.media.play_sound(sound_path)
+        except Exception:
+            if speaker_until is not None:
+                _speaker_lock.release()
+            raise
+
+    period = 1.0 / MOVE_PLAY_HZ
+    duration = float(times[-1])
+    t0 = time.monotonic()
+    try:
+        while not stop.is_set():
+            t = time.monotonic() - t0
+            if t >= duration:
+                break
+            i = max(0, int(np.searchsorted(times, t, side="right")) - 1)
+            j = min(i + 1, len(rows) - 1)
+            span = times[j] - times[i]
+            alpha = (t - times[i]) / span if span > 0 else 0.0
+            a, b = rows[i], rows[j]
+            robot.set_target(
+                head=linear_pose_interpolation(
+                    a[_TRAJ_HEAD].reshape(4, 4), b[_TRAJ_HEAD].reshape(4, 4), alpha
+                ),
+                antennas=list(a[_TRAJ_ANTENNAS] + alpha * (b[_TRAJ_ANTENNAS] - a[_TRAJ_ANTENNAS])),
+                body_yaw=float(a[_TRAJ_BODY_YAW] + alpha * (b[_TRAJ_BODY_YAW] - a[_TRAJ_BODY_YAW])),
+            )
+            if speaker_until is not None and time.monotonic() >= speaker_until:
+                _speaker_lock.release()
+                speaker_until = None
+            time.sleep(max(0.0, period - (time.monotonic() - t0 - t)))
+    finally:
+        if speaker_until is not None:
+            # Sound outlasting the motion keeps the speaker until it ends
+            stop.wait(max(0.0, speaker_until - time.monotonic()))
+            _speaker_lock.release()
+
+
+def _play_cached_move(library: str, move_name: str) -> str:
+    """Start streaming a cached move in the background (non-blocking)."""
+    global _local_move_thread, _local_move_stop
+
+    store = get_move_store()
+    rows = store.trajectory(library, move_name)
+    sound_path = store.sound_path(library, move_name)
+    robot = get_robot()
+
+    # A new move interrupts the one in progress, like the daemon does
+    stop_local_move()
+
+    duration = MOVE_LEAD_IN + float(rows[-1, _TRAJ_TIME])
+    _hold_tracking(duration)
+
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=_stream_trajectory,
+        args=(robot, rows, sound_path, stop, not _speaker_held.get()),
+        name=f"move-{move_name}",
+        daemon=True
+    )
+    _local_move_stop = stop
+    _local_move_thread = thread
+    thread.start()
+
+    return f"Playing: {move_name} (local, {duration:.1f}s)"
+
+
+def stop_local_move():
+    """
+    Stop a locally streamed move, if one is playing.
+
+    Every motor command calls this first (like _hold_tracking): the stream
+    keeps pushing set_target() at MOVE_PLAY_HZ after show() returns and
+    would otherwise overwrite the new command until the move ends.
+    """
+    thread = _local_move_thread
+    if _local_move_stop is not None:
+        _local_move_stop.set()
+    if thread is not None and thread is not threading.current_thread() and thread.is_alive():
+        thread.join(timeout=1.0)
+
+
+def _wait_for_local_move(timeout: float) -> bool:
+    """Wait for a locally streamed move. True if none running or it finished."""
+    thread = _local_move_thread
+    if thread is None or not thread.is_alive():
+        return True
+    thread.join(timeout=timeout)
+    return not thread.is_alive()
+
+
+def move_duration(name: str) -> Optional[float]:
+    """
+    Expected duration of a move in seconds, for scheduling.
+
+    Built-in expressions use their configured duration; recorded moves use
+    the local store. None if the move is not cached locally.
+    """
+    if name in EXPRESSIONS:
+        return EXPRESSIONS[name]["duration"]
+    duration = get_move_store().duration(name)
+    return MOVE_LEAD_IN + duration if duration is not None else None
+
+
 @mcp.tool()
+@arbitrated(set())
+@traced
 def discover(library: Literal["emotions", "dances"] = "emotions") -> str:
     """
     Discover available moves from Pollen's HuggingFace libraries.
@@ -826,13 +2439,22 @@ def discover(library: Literal["emotions", "dances"] = "emotions") -> str:
     if not dataset:
         return f"Unknown library: {library}. Available: {list(MOVE_LIBRARIES.keys())}"
 
+    store = get_move_store()
+    if store.has_library(library):
+        moves = store.list_moves(library)
+        return f"Available {library} ({len(moves)}): {', '.join(moves)}"
+
     try:
-        response = httpx.get(
-            f"{DAEMON_URL}/move/recorded-move-datasets/list/{dataset}",
-            timeout=10.0
-        )
-        response.raise_for_status()
-        moves = response.json()
+        def list_moves():
+            response = httpx.get(
+                f"{DAEMON_URL}/move/recorded-move-datasets/list/{dataset}",
+                timeout=10.0
+            )
+            response.raise_for_status()
+            return response.json()
+
+        with trace_stage("daemon"):
+            moves = _daemon_flight.do(("list", dataset), list_moves)
         return f"Available {library} ({len(moves)}): {', '.join(sorted(moves))}"
     except httpx.ConnectError:
         return "Cannot connect to daemon. Is it running on localhost:8321?"
@@ -840,15 +2462,32 @@ def discover(library: Literal["emotions", "dances"] = "emotions") -> str:
         return f"Failed to list moves: {e}"
 
 
+@traced_stage("move")
 def _do_play_move(move_name: str, library: str = "emotions") -> str:
-    """Internal helper - play a recorded move."""
+    """
+    Internal helper - play a recorded move.
+
+    Streams from the local move store when the move is cached,
+    otherwise asks the daemon to resolve and play it.
+    """
     import httpx
 
     dataset = MOVE_LIBRARIES.get(library)
     if not dataset:
         return f"Unknown library: {library}. Available: {list(MOVE_LIBRARIES.keys())}"
 
+    found = get_move_store().lookup(move_name, library)
+    if found is not None:
+        try:
+            return _play_cached_move(found[0], move_name)
+        except Exception as e:
+            import sys
+            # Likely a corrupt cache entry - say so, then let the daemon play it
+            print(f"Cached move {move_name} failed, using daemon: {e}", file=sys.stderr)
+
     try:
+        stop_local_move()
+        _hold_tracking(DAEMON_MOVE_HOLD)
         response = httpx.post(
             f"{DAEMON_URL}/move/play/recorded-move-dataset/{dataset}/{move_name}",
             timeout=30.0
@@ -864,15 +2503,479 @@ def _do_play_move(move_name: str, library: str = "emotions") -> str:
         return f"Failed to play move: {e}"
 
 
+# ==============================================================================
+# SCRIPTED PERFORMANCE
+# ==============================================================================
+# perform() runs a whole multi-action script server-side in one tool call.
+# Steps run in order; a step that is a list runs its actions concurrently,
+# except that actions sharing a resource (motors, speaker, mic, camera) are
+# serialized in script order so they never fight over the hardware.
+
+PERFORM_MAX_ACTIONS = 32
+
+ACTION_RESOURCES = {
+    "show": {"motors"},
+    "look": {"motors"},
+    "rest": {"motors"},
+    "speak": {"speaker"},
+    "listen": {"mic"},
+    "snap": {"camera"},
+    "wait": set(),
+}
+
+
+# Arguments that must be numbers, checked before anything runs
+NUMERIC_ACTION_ARGS = (
+    "delay", "roll", "pitch", "yaw", "z", "duration", "listen_after", "pre_roll", "seconds",
+)
+
+
+def _validate_script(script) -> Optional[str]:
+    """Check a perform() script up front. Returns error text, or None if valid."""
+    if not isinstance(script, list):
+        return "Invalid script: expected a list of steps"
+    number = 0
+    for step in script:
+        for action in step if isinstance(step, list) else [step]:
+            number += 1
+            if not isinstance(action, dict):
+                return f"Invalid action {number}: expected an object, got {type(action).__name__}"
+            kind = action.get("action")
+            if kind not in ACTION_RESOURCES:
+                return f"Invalid action {number}: unknown action {kind!r}. Available: {list(ACTION_RESOURCES.keys())}"
+            if kind == "snap" and action.get("crop"):
+                return (
+                    f"Invalid action {number} (snap): crop is not available in perform() - "
+                    'call snap(mode="summary", crop=True) directly'
+                )
+            for key in NUMERIC_ACTION_ARGS:
+                if key in action:
+                    try:
+                        float(action[key])
+                    except (TypeError, ValueError):
+                        return f"Invalid action {number} ({kind}): {key} must be a number, got {action[key]!r}"
+    return None
+
+
+def _action_resources(action: dict) -> set:
+    """Resources an action will hold while it runs."""
+    resources = set(ACTION_RESOURCES.get(action.get("action"), set()))
+    if action.get("action") == "speak":
+        if "[move:" in str(action.get("text", "")):
+            resources.add("motors")
+        if float(action.get("listen_after", 0)) > 0:
+            resources.add("mic")
+    return resources
+
+
+def _run_action(action: dict) -> str:
+    """Execute a single script action and return its result text."""
+    delay = max(0.0, min(30.0, float(action.get("delay", 0))))
+    if delay:
+        time.sleep(delay)
+
+    kind = action.get("action")
+    if kind == "show":
+        move = action.get("move", "")
+        if not move:
+            return _do_express(action.get("emotion", "neutral"))
+        result = _do_play_move(move)
+        if action.get("wait", True):
+            expected = move_duration(move) or 10.0
+            _wait_for_moves_complete(timeout=expected + 2.0)
+        return result
+    if kind == "look":
+        return _do_look(
+            roll=float(action.get("roll", 0)),
+            pitch=float(action.get("pitch", 0)),
+            yaw=float(action.get("yaw", 0)),
+            z=float(action.get("z", 0)),
+            duration=float(action.get("duration", 1.0))
+        )
+    if kind == "speak":
+        return _do_speak(
+            str(action.get("text", "")),
+            float(action.get("listen_after", 0)),
+            action.get("voice")
+        )
+    if kind == "listen":
+        transcript = _do_listen(
+            float(action.get("duration", 3.0)),
+            float(action.get("pre_roll", LISTEN_PRE_ROLL))
+        )
+        return f"Heard: {transcript}" if transcript else "Heard: (silence or unclear audio)"
+    if kind == "snap":
+        # Text only - the frame stays on the server under its URI
+        return _do_snap(
+            action.get("mode", "image"),
+            people=bool(action.get("people", False)),
+            inline=False
+        )
+    if kind == "rest":
+        return _do_rest(action.get("mode", "neutral"))
+    if kind == "wait":
+        seconds = max(0.0, min(30.0, float(action.get("seconds", 1.0))))
+        time.sleep(seconds)
+        return f"Waited {seconds:g}s"
+    return f"Unknown action: {kind}. Available: {list(ACTION_RESOURCES.keys())}"
+
+
+def _plan_lanes(group: list[tuple[int, dict]]) -> list[list[tuple[int, dict]]]:
+    """
+    Split a parallel group into lanes that can run concurrently.
+
+    Actions that share any resource end up in the same lane, in script order.
+    """
+    lanes: list[tuple[set, list]] = []
+    for index, action in group:
+        resources = _action_resources(action)
+        conflicting = [lane for lane in lanes if lane[0] & resources]
+        if not conflicting:
+            lanes.append((set(resources), [(index, action)]))
+            continue
+        merged_resources, merged_actions = conflicting[0]
+        for other in conflicting[1:]:
+            merged_resources |= other[0]
+            merged_actions.extend(other[1])
+            lanes.remove(other)
+        merged_resources |= resources
+        merged_actions.append((index, action))
+        merged_actions.sort(key=lambda item: item[0])
+    return [actions for _, actions in lanes]
+
+
+@mcp.tool()
+@arbitrated(_script_resources)
+@traced
+def perform(script: list[dict | list[dict]]) -> str:
+    """
+    Run a multi-action script in one call.
+
+    Saves a round trip per action: the whole sequence runs on the robot
+    and one combined result comes back.
+
+    Each action is a dict with "action" plus that tool's arguments:
+        {"action": "look", "yaw": -30}
+        {"action": "snap", "mode": "summary"}
+        {"action": "show", "emotion": "curious"}  or  {"action": "show", "move": "fear1"}
+        {"action": "speak", "text": "Hello!", "voice": "eve"}
+        {"action": "listen", "duration": 3}
+        {"action": "rest", "mode": "neutral"}
+        {"action": "wait", "seconds": 0.5}
+    Any action may add "delay" (seconds to wait before starting).
+    snap inside a script reports its reachy://frames URI instead of image data
+    (so "crop" is not accepted there; "mode" and "people" are).
+
+    Steps run in order. A step that is a list runs its actions at the same
+    time, e.g. [{"action": "show", "emotion": "joy"}, {"action": "speak", "text": "Yay"}].
+    Actions needing the same hardware still take turns.
+
+    Args:
+        script: Ordered steps - an action dict or a list of concurrent action dicts
+
+    Returns:
+        One line per action with its timing and result
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    error = _validate_script(script)
+    if error:
+        return error
+
+    steps = [step if isinstance(step, list) else [step] for step in script]
+    total = sum(len(step) for step in steps)
+    if total == 0:
+        return "Empty script"
+    if total > PERFORM_MAX_ACTIONS:
+        return f"Script too long: {total} actions (max {PERFORM_MAX_ACTIONS})"
+
+    results: dict[int, str] = {}
+    start = time.monotonic()
+
+    def run_lane(lane: list[tuple[int, dict]]):
+        for index, action in lane:
+            action_start = time.monotonic()
+            try:
+                result = _run_action(action)
+            except Exception as e:
+                result = f"failed: {e}"
+            elapsed = time.monotonic() - action_start
+            results[index] = f"{index + 1} {action.get('action')} {elapsed:.1f}s: {result}"
+
+    index = 0
+    with ThreadPoolExecutor(max_workers=PERFORM_MAX_ACTIONS) as pool:
+        for step in steps:
+            group = list(enumerate(step, start=index))
+            index += len(step)
+            lanes = _plan_lanes(group)
+            if len(lanes) == 1:
+                run_lane(lanes[0])
+            else:
+                # Copy the context so lanes report their trace stages
+                futures = [
+                    pool.submit(contextvars.copy_context().run, run_lane, lane)
+                    for lane in lanes
+                ]
+                for future in futures:
+                    future.result()
+
+    elapsed = time.monotonic() - start
+    lines = [f"Performed {total} actions in {elapsed:.1f}s"]
+    lines.extend(results[i] for i in sorted(results))
+    return " | ".join(lines)
+
+
+# ==============================================================================
+# HEAD TRACKING
+# ==============================================================================
+# Closed-loop gaze control at camera frame rate. Each tick grabs a frame,
+# finds the target, converts its pixel offset to yaw/pitch and streams a
+# smoothed set_target, all without a round trip through the LLM.
+
+TRACK_RATE = float(os.environ.get("REACHY_TRACK_HZ", "20"))
+TRACK_GAIN = 0.6        # Fraction of the measured offset corrected per frame
+TRACK_SMOOTHING = 0.35  # EMA factor toward the goal pose per tick
+TRACK_DEADBAND = 1.5    # Degrees of offset ignored to avoid jitter
+
+_tracker = None
+_tracking_hold_until = 0.0
+
+
+def _hold_tracking(seconds: float):
+    """Pause tracking output while another motor command runs."""
+    global _tracking_hold_until
+    _tracking_hold_until = max(_tracking_hold_until, time.monotonic() + seconds)
+
+
+class HeadTracker:
+    """Background loop keeping the head pointed at a face or person."""
+
+    def __init__(self, robot, target: str = "face", rate: float = TRACK_RATE):
+        self._robot = robot
+        self.target = target
+        self.rate = max(1.0, min(30.0, rate))
+        self.yaw = 0.0
+        self.pitch = 0.0
+        self._goal_yaw = 0.0
+        self._goal_pitch = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="head-tracker", daemon=True)
+        self._detector = None
+
+        # Metrics
+        self.started_at = 0.0
+        self.frames = 0
+        self.detections = 0
+        self.last_seen = 0.0
+        self.loop_hz = 0.0
+        self.latency_ms = 0.0
+        self.max_latency_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self):
+        # Own detector: the shared ones may be in use by snap() on another thread
+        self._detector = _new_person_detector() if self.target == "person" else _new_face_detector()
+        self._sync_pose()
+        self.started_at = time.monotonic()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+
+    def _sync_pose(self):
+        """Start from the current head pose so tracking doesn't jump."""
+        angles = current_head_angles(self._robot)
+        if angles is not None:  # Otherwise keep the last known pose
+            self.yaw, self.pitch = angles
+            self._goal_yaw, self._goal_pitch = angles
+
+    def _find_target(self, frame: np.ndarray) -> Optional[list[int]]:
+        gray, scale = _downscale_gray(frame)
+        if self.target == "person":
+            rects, _ = self._detector.detectMultiScale(gray, winStride=(8, 8))
+            boxes = [[int(round(v * scale)) for v in box] for box in rects]
+            boxes.sort(key=lambda b: b[2] * b[3], reverse=True)
+        else:
+            boxes = detect_faces(gray, scale, self._detector)
+        return boxes[0] if boxes else None
+
+    def _step(self, box: Optional[list[int]], width: int, height: int):
+        """Move the goal toward a detected box, then smooth the pose toward the goal."""
+        if box is not None:
+            x, y, w, h = box
+            yaw_off, pitch_off = pixel_to_head_angles(x + w / 2, y + h / 2, width, height)
+            if abs(yaw_off) > TRACK_DEADBAND:
+                self._goal_yaw = max(-90, min(90, self.yaw + TRACK_GAIN * yaw_off))
+            if abs(pitch_off) > TRACK_DEADBAND:
+                self._goal_pitch = max(-30, min(30, self.pitch + TRACK_GAIN * pitch_off))
+
+        self.yaw += TRACK_SMOOTHING * (self._goal_yaw - self.yaw)
+        self.pitch += TRACK_SMOOTHING * (self._goal_pitch - self.pitch)
+
+    def _run(self):
+        period = 1.0 / self.rate
+        last_tick = None
+        held = False
+        while not self._stop.is_set():
+            tick = time.monotonic()
+            if last_tick is not None:
+                hz = 1.0 / max(tick - last_tick, 1e-6)
+                self.loop_hz = hz if self.loop_hz == 0 else 0.9 * self.loop_hz + 0.1 * hz
+            last_tick = tick
+
+            if tick < _tracking_hold_until:
+                held = True
+                self._stop.wait(period)
+                continue
+            if held:
+                # Someone else moved the head - continue from where it is now
+                self._sync_pose()
+                held = False
+
+            try:
+                frame = capture_frame(self._robot)
+                captured = time.monotonic()
+                box = self._find_target(frame) if frame is not None else None
+            except Exception:
+                frame, box, captured = None, None, time.monotonic()
+
+            if frame is not None:
+                self.frames += 1
+            if box is not None:
+                self.detections += 1
+                self.last_seen = captured
+            height, width = frame.shape[:2] if frame is not None else (0, 0)
+            self._step(box, width, height)
+            try:
+                self._robot.set_target(
+                    head=create_head_pose_array(pitch=self.pitch, yaw=self.yaw)
+                )
+            except Exception:
+                pass  # Transient SDK error - retry next tick
+
+            if box is not None:
+                latency = (time.monotonic() - captured) * 1000
+                self.latency_ms = latency if self.latency_ms == 0 else 0.9 * self.latency_ms + 0.1 * latency
+                self.max_latency_ms = max(self.max_latency_ms, latency)
+
+            self._stop.wait(max(0.0, period - (time.monotonic() - tick)))
+
+    def status(self) -> str:
+        now = time.monotonic()
+        seen = f"{now - self.last_seen:.1f}s ago" if self.last_seen else "never"
+        return (
+            f"Tracking {self.target}: {'running' if self.running else 'stopped'}, "
+            f"{self.loop_hz:.1f} Hz (target {self.rate:g}), "
+            f"latency {self.latency_ms:.0f}ms avg / {self.max_latency_ms:.0f}ms max, "
+            f"{self.detections}/{self.frames} frames with target, last seen {seen}, "
+            f"head yaw={self.yaw:.1f}° pitch={self.pitch:.1f}°"
+        )
+
+
+def stop_tracking() -> Optional[str]:
+    """Stop the tracker if running. Returns its final status."""
+    global _tracker
+    if _tracker is None:
+        return None
+    _tracker.stop()
+    status = _tracker.status()
+    _tracker = None
+    return status
+
+
+@mcp.tool()
+@arbitrated(lambda args: {"motors"} if args["action"] == "start" else set())
+@traced
+def track(
+    action: Literal["start", "stop", "status"] = "start",
+    target: Literal["face", "person"] = "face",
+    rate: float = TRACK_RATE
+) -> str:
+    """
+    Keep the head pointed at a face or person, on the robot, until stopped.
+
+    Runs detection and head control at camera frame rate - far smoother
+    than repeated snap()/look() calls. Other motion tools (show, look,
+    speak moves) pause tracking while they play; it then resumes.
+
+    Args:
+        action: "start" tracking, "stop" it, or get "status" metrics
+        target: What to follow - "face" or "person" (slower)
+        rate: Control loop rate in Hz (1-30, default 20)
+
+    Returns:
+        Confirmation, or loop rate / latency / detection metrics
+    """
+    global _tracker
+
+    if action == "status":
+        return _tracker.status() if _tracker is not None else "Tracking: stopped"
+
+    if action == "stop":
+        status = stop_tracking()
+        return f"Stopped. {status}" if status else "Tracking: not running"
+
+    try:
+        robot = get_robot()
+        stop_tracking()
+        tracker = HeadTracker(robot, target=target, rate=rate)
+        tracker.start()
+        _tracker = tracker
+        return f"Tracking {target} at {tracker.rate:g} Hz"
+    except ImportError:
+        return "OpenCV not available for tracking"
+    except Exception as e:
+        return f"Tracking failed: {e}"
+
+
 # ==============================================================================
 # MAIN
 # ==============================================================================
 
 def main():
-    """Run the MCP server."""
+    """Run the MCP server, or replay a recorded trace against one."""
+    import argparse
     import atexit
+
+    parser = argparse.ArgumentParser(prog="reachy-mini-mcp", description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command")
+    replay = commands.add_parser("replay", help="Re-issue a REACHY_TRACE_FILE trace and report latency")
+    replay.add_argument("trace", help="Trace file (JSON lines)")
+    replay.add_argument("--speed", type=float, default=1.0,
+                        help="Speed-up factor for inter-call gaps (0 = back to back)")
+    replay.add_argument("--server", default=os.path.abspath(__file__),
+                        help="Server script or http(s) URL (default: spawn this server)")
+    parser.add_argument("--transport", choices=["stdio", "http"], default=MCP_TRANSPORT,
+                        help="stdio (one client) or http (shared by many clients)")
+    parser.add_argument("--host", default=MCP_HOST, help="HTTP bind address")
+    parser.add_argument("--port", type=int, default=MCP_PORT, help="HTTP port")
+    args = parser.parse_args()
+
+    if args.command == "replay":
+        print(replay_trace(args.trace, args.server, args.speed))
+        return
+
+    start_trace()
+    atexit.register(cleanup_trace)
     atexit.register(cleanup_robot)
-    mcp.run()
+    atexit.register(cleanup_mic_buffer)
+    atexit.register(stop_tracking)
+    atexit.register(cleanup_media_pool)
+    threading.Thread(target=start_mic_buffer, name="mic-start", daemon=True).start()
+    if MOVE_PREFETCH:
+        threading.Thread(target=prefetch_moves, name="move-prefetch", daemon=True).start()
+    get_media_pool()  # Spawn workers now, not on first snap()
+
+    if args.transport == "http":
+        # One long-running process: clients share the robot, caches and workers
+        mcp.run(transport="http", host=args.host, port=args.port)
+    else:
+        mcp.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,553 @@
+"""Tests for server logic that runs without robot hardware."""
+
+import os
+
+import numpy as np
+import pytest
+
+from src import server
+
+
+class FakeMedia:
+    """Stand-in for robot.media with a fixed input format."""
+
+    def __init__(self, sample_rate=10, channels=1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    def get_input_audio_samplerate(self):
+        return self.sample_rate
+
+    def get_input_channels(self):
+        return self.channels
+
+
+class FakeRobot:
+    def __init__(self, **media):
+        self.media = FakeMedia(**media)
+
+
+# ------------------------------------------------------------------------------
+# MicrophoneRingBuffer
+# ------------------------------------------------------------------------------
+
+def _frames(start, stop):
+    return np.arange(start, stop, dtype=np.float32).reshape(-1, 1) / 100
+
+
+def test_ring_buffer_read_wraps_around():
+    mic = server.MicrophoneRingBuffer(FakeRobot(), seconds=1)  # 10 frames
+    mic._write(_frames(0, 8))
+    mic._write(_frames(8, 14))  # Wraps: frames 0-3 overwritten
+
+    assert mic.position == 14
+    np.testing.assert_allclose(mic.read(6, 14), _frames(6, 14))
+
+
+def test_ring_buffer_clips_to_oldest_and_newest_frame():
+    mic = server.MicrophoneRingBuffer(FakeRobot(), seconds=1)
+    mic._write(_frames(0, 14))
+
+    np.testing.assert_allclose(mic.read(0), _frames(4, 14))   # Too old
+    np.testing.assert_allclose(mic.read(12, 99), _frames(12, 14))  # Future
+    assert mic.read(14).shape == (0, 1)
+
+
+def test_ring_buffer_keeps_tail_of_oversized_chunk():
+    mic = server.MicrophoneRingBuffer(FakeRobot(), seconds=1)
+    mic._write(_frames(0, 25))
+
+    assert mic.position == 25
+    np.testing.assert_allclose(mic.latest(1), _frames(15, 25))
+
+
+def test_ring_buffer_normalises_int16_and_mono():
+    mic = server.MicrophoneRingBuffer(FakeRobot(channels=2), seconds=1)
+    mic._write(np.array([16384, -16384], dtype=np.int16))
+
+    np.testing.assert_allclose(mic.read(0), [[0.5, 0.5], [-0.5, -0.5]])
+
+
+# ------------------------------------------------------------------------------
+# MoveStore
+# ------------------------------------------------------------------------------
+
+def _move(timestamps, frames):
+    from types import SimpleNamespace
+    return SimpleNamespace(timestamps=timestamps, trajectory=frames)
+
+
+def test_move_to_rows_rebases_time_and_flattens_head():
+    frame = {"head": np.eye(4).tolist(), "antennas": [0.1, 0.2], "body_yaw": 0.3}
+    rows = server._move_to_rows(_move([5.0, 5.5], [frame, frame]))
+
+    assert rows.shape == (2, 20)
+    np.testing.assert_allclose(rows[:, 0], [0.0, 0.5])
+    np.testing.assert_allclose(rows[0, 1:17], np.eye(4).reshape(16))
+    np.testing.assert_allclose(rows[0, 17:], [0.1, 0.2, 0.3])
+
+
+@pytest.mark.parametrize("timestamps, frames", [([], []), ([0.0, 1.0], [{}])])
+def test_move_to_rows_rejects_malformed_moves(timestamps, frames):
+    with pytest.raises(ValueError):
+        server._move_to_rows(_move(timestamps, frames))
+
+
+def test_stop_local_move_ends_the_stream(monkeypatch):
+    import threading
+
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait, args=(5,), daemon=True)
+    thread.start()
+    monkeypatch.setattr(server, "_local_move_stop", stop)
+    monkeypatch.setattr(server, "_local_move_thread", thread)
+
+    server.stop_local_move()
+
+    assert not thread.is_alive()
+    assert server._wait_for_local_move(0)
+
+
+# ------------------------------------------------------------------------------
+# perform() planning
+# ------------------------------------------------------------------------------
+
+def _lanes(*actions):
+    return [[i for i, _ in lane] for lane in server._plan_lanes(list(enumerate(actions)))]
+
+
+def test_plan_lanes_separates_independent_resources():
+    assert _lanes(
+        {"action": "look"}, {"action": "snap"}, {"action": "listen"}, {"action": "wait"}
+    ) == [[0], [1], [2], [3]]
+
+
+def test_plan_lanes_merges_conflicts_in_script_order():
+    # speak with a move marker needs motors; listen_after needs the mic.
+    # It bridges the look (motors) and listen (mic) lanes into one.
+    assert _lanes(
+        {"action": "look"},
+        {"action": "listen"},
+        {"action": "snap"},
+        {"action": "speak", "text": "hi [move:joy1]", "listen_after": 2},
+    ) == [[0, 1, 3], [2]]
+
+
+@pytest.mark.parametrize("script, message", [
+    ("look", "expected a list"),
+    (["look"], "Invalid action 1: expected an object"),
+    ([{"action": "dance"}], "unknown action 'dance'"),
+    ([[{"action": "wait"}, {"action": "speak", "listen_after": "abc"}]], "Invalid action 2 (speak): listen_after"),
+])
+def test_validate_script_reports_bad_actions(script, message):
+    assert message in server._validate_script(script)
+    assert server._script_resources({"script": script}) == set()
+
+
+def test_validate_script_accepts_valid_script():
+    script = [{"action": "look", "yaw": "10"}, [{"action": "snap"}, {"action": "wait"}]]
+    assert server._validate_script(script) is None
+    assert server._script_resources({"script": script}) == {"motors", "camera"}
+
+
+def test_tool_resources_never_lock_the_mic():
+    action = {"action": "speak", "text": "[move:happy1] hi", "listen_after": 3}
+    assert server._tool_resources(action) == {"motors"}
+    assert server._tool_resources({"action": "listen"}) == set()
+
+
+# ------------------------------------------------------------------------------
+# Head tracking signs
+# ------------------------------------------------------------------------------
+# The SDK builds head poses with scipy "xyz" Euler angles in a frame with
+# x forward, y left, z up (reachy_mini.utils.create_head_pose). These tests
+# project a fixed target into the camera for the current head pose and check
+# the tracker turns toward it rather than away.
+
+WIDTH, HEIGHT = 640, 480
+
+
+def _head_rotation(yaw, pitch):
+    from scipy.spatial.transform import Rotation
+    return Rotation.from_euler("xyz", [0, pitch, yaw], degrees=True)
+
+
+def _project(target, yaw, pitch):
+    """Pixel centre of a world direction seen from the given head pose."""
+    x_fwd, y_left, z_up = _head_rotation(yaw, pitch).inv().apply(target)
+    focal = (WIDTH / 2) / np.tan(np.radians(server.CAMERA_HFOV / 2))
+    return WIDTH / 2 - focal * y_left / x_fwd, HEIGHT / 2 - focal * z_up / x_fwd
+
+
+def _box_at(px, py, size=40):
+    return [int(px - size / 2), int(py - size / 2), size, size]
+
+
+def test_pixel_to_head_angles_points_at_pixel():
+    pytest.importorskip("scipy")
+    target = _head_rotation(-20, 10).apply([1, 0, 0])  # Right and below
+    yaw, pitch = server.pixel_to_head_angles(*_project(target, 0, 0), WIDTH, HEIGHT)
+
+    assert yaw == pytest.approx(-20, abs=0.01)
+    assert pitch == pytest.approx(10, abs=0.01)
+
+
+def test_tracker_turns_toward_target_right_of_centre():
+    pytest.importorskip("scipy")
+    tracker = server.HeadTracker(robot=None)
+    tracker._step(_box_at(WIDTH * 0.8, HEIGHT / 2), WIDTH, HEIGHT)
+
+    # Head's forward vector now points right (negative y) in the SDK frame
+    forward = _head_rotation(tracker.yaw, tracker.pitch).apply([1, 0, 0])
+    assert forward[1] < 0
+
+
+def test_tracker_converges_instead_of_running_to_clamp():
+    pytest.importorskip("scipy")
+    target = _head_rotation(-25, -12).apply([1, 0, 0])  # Right and above
+    tracker = server.HeadTracker(robot=None)
+
+    for _ in range(60):
+        box = _box_at(*_project(target, tracker.yaw, tracker.pitch))
+        tracker._step(box, WIDTH, HEIGHT)
+
+    assert tracker.yaw == pytest.approx(-25, abs=server.TRACK_DEADBAND * 2)
+    assert tracker.pitch == pytest.approx(-12, abs=server.TRACK_DEADBAND * 2)
+
+
+def test_detection_angles_are_absolute_look_angles():
+    centred = server._detection(_box_at(WIDTH / 2, HEIGHT / 2), WIDTH, HEIGHT, (15.0, -5.0))
+    right = server._detection(_box_at(WIDTH * 0.8, HEIGHT / 2), WIDTH, HEIGHT, (15.0, -5.0))
+
+    assert (centred["yaw"], centred["pitch"]) == (15.0, -5.0)
+    assert right["yaw"] < 15.0  # Further right = more negative yaw
+
+
+def test_tracker_frame_grabs_share_the_camera_lock():
+    class Camera:
+        def get_frame(self):
+            assert server._camera_lock.locked()
+            return np.zeros((2, 2, 3), dtype=np.uint8)
+
+    robot = FakeRobot()
+    robot.media = Camera()
+
+    assert server.capture_frame(robot).shape == (2, 2, 3)
+    assert not server._camera_lock.locked()
+
+
+# ------------------------------------------------------------------------------
+# FrameStore
+# ------------------------------------------------------------------------------
+
+def test_frame_store_evicts_least_recently_used():
+    store = server.FrameStore(size=2)
+    first = store.add(np.zeros((2, 2, 3), dtype=np.uint8))
+    second = store.add(np.ones((2, 2, 3), dtype=np.uint8))
+
+    assert store.get(first) is not None  # Read keeps it alive
+    third = store.add(np.ones((2, 2, 3), dtype=np.uint8))
+
+    assert [f["id"] for f in store.list()] == [first, third]
+    assert store.get(second) is None
+
+
+def test_perform_rejects_snap_crop():
+    assert "crop is not available" in server._validate_script([{"action": "snap", "crop": True}])
+
+
+# ------------------------------------------------------------------------------
+# Media workers
+# ------------------------------------------------------------------------------
+
+def test_broken_media_pool_is_dropped_and_work_done_inline(monkeypatch):
+    from concurrent.futures.process import BrokenProcessPool
+
+    class BrokenPool:
+        def submit(self, *args):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, **kwargs):
+            self.shut_down = True
+
+    pool = BrokenPool()
+    monkeypatch.setattr(server, "MEDIA_WORKERS", 1)
+    monkeypatch.setattr(server, "_media_pool", pool)
+    audio = np.zeros(server.MEDIA_OFFLOAD_MIN_BYTES, dtype=np.int16)
+
+    assert server.encode_wav(audio, 16000, 1) == server.media_jobs.encode_wav(audio, 16000, 1)
+    assert server._media_pool is None
+    assert pool.shut_down
+
+
+# ------------------------------------------------------------------------------
+# Tracing
+# ------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("pct, expected", [(0, 1), (50, 5), (95, 10), (99, 10), (100, 10)])
+def test_percentile_uses_nearest_rank(pct, expected):
+    assert server._percentile(list(range(10, 0, -1)), pct) == expected
+
+
+def test_percentile_of_single_value():
+    assert server._percentile([42.0], 99) == 42.0
+
+
+def test_trace_file_is_not_opened_on_import():
+    assert server._trace_recorder is None
+
+
+def test_trace_includes_time_queued_for_hardware(tmp_path, monkeypatch):
+    import asyncio
+    import json
+
+    recorder = server.TraceRecorder(str(tmp_path / "trace.jsonl"))
+    monkeypatch.setattr(server, "_trace_recorder", recorder)
+
+    @server.arbitrated({"test-queue"})
+    @server.traced
+    def tool():
+        return "done"
+
+    async def contended():
+        async with server._arbiter.hold({"test-queue"}, "other"):
+            call = asyncio.create_task(tool())
+            await asyncio.sleep(0.1)
+        return await call
+
+    assert asyncio.run(contended()) == "done"
+    recorder.close()
+    record = json.loads((tmp_path / "trace.jsonl").read_text())
+
+    assert record["stages"]["queue"] >= 90
+    assert record["ms"] >= record["stages"]["queue"]
+
+
+# ------------------------------------------------------------------------------
+# ResourceArbiter
+# ------------------------------------------------------------------------------
+# Each test uses its own resource names: asyncio locks bind to the first
+# event loop that waits on them.
+
+def test_arbiter_serves_waiters_in_arrival_order():
+    import asyncio
+
+    arbiter = server.ResourceArbiter()
+    order = []
+
+    async def call(client):
+        async with arbiter.hold({"motors"}, client):
+            order.append(client)
+            await asyncio.sleep(0.01)
+
+    async def clients():
+        async with arbiter.hold({"motors"}, "first"):
+            tasks = []
+            for client in ["a", "b", "c"]:
+                tasks.append(asyncio.create_task(call(client)))
+                await asyncio.sleep(0)
+            snapshot = arbiter.snapshot()["resources"]["motors"]
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+        return snapshot
+
+    assert asyncio.run(clients()) == {"holder": "first", "waiting": 3}
+    assert order == ["a", "b", "c"]
+    assert arbiter.snapshot()["resources"]["motors"] == {"holder": None, "waiting": 0}
+
+
+def test_cancelled_call_keeps_resources_until_its_thread_finishes():
+    import asyncio
+    import threading
+
+    release = threading.Event()
+    events = []
+
+    @server.arbitrated({"test-cancel"})
+    def slow():
+        events.append("a start")
+        release.wait(5)
+        events.append("a end")
+
+    @server.arbitrated({"test-cancel"})
+    def fast():
+        events.append("b")
+
+    async def cancel_then_call():
+        a = asyncio.create_task(slow())
+        await asyncio.sleep(0.1)
+        a.cancel()
+        b = asyncio.create_task(fast())
+        await asyncio.sleep(0.2)
+        assert events == ["a start"]  # B must not run while A's thread does
+        release.set()
+        await b
+        with pytest.raises(asyncio.CancelledError):
+            await a
+
+    asyncio.run(cancel_then_call())
+    assert events == ["a start", "a end", "b"]
+
+
+def test_blocked_unheld_calls_do_not_starve_hardware_calls(monkeypatch):
+    import asyncio
+    import threading
+
+    monkeypatch.setattr(server, "TOOL_THREADS", 1)
+    monkeypatch.setattr(server, "_free_executor", None)
+    release = threading.Event()
+
+    @server.arbitrated(set())
+    def listening():
+        release.wait(5)
+
+    @server.arbitrated({"test-starve"})
+    def look():
+        return "looked"
+
+    async def busy_then_look():
+        listener = asyncio.create_task(listening())
+        await asyncio.sleep(0.05)  # The only free thread is now blocked
+        try:
+            return await asyncio.wait_for(look(), timeout=1)
+        finally:
+            release.set()
+            await listener
+
+    assert asyncio.run(busy_then_look()) == "looked"
+
+
+# ------------------------------------------------------------------------------
+# SingleFlight
+# ------------------------------------------------------------------------------
+
+def _join_in_flight(flight, key, fn, followers=3):
+    """Start a leader running `fn`, join it from `followers` threads, return outcomes."""
+    import threading
+
+    release = threading.Event()
+    outcomes = []
+
+    def leader_fn():
+        release.wait(5)
+        return fn()
+
+    def call(target):
+        try:
+            outcomes.append(("ok", flight.do(key, target)))
+        except Exception as e:
+            outcomes.append(("error", e))
+
+    leader = threading.Thread(target=call, args=(leader_fn,))
+    leader.start()
+    while flight.stats()["in_flight"] == 0:
+        pass
+    threads = [threading.Thread(target=call, args=(fn,)) for _ in range(followers)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["shared"] < followers:
+        pass
+    release.set()
+    for thread in [leader] + threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_single_flight_shares_one_result():
+    flight = server.SingleFlight()
+    outcomes = _join_in_flight(flight, "k", lambda: 42)
+
+    assert outcomes == [("ok", 42)] * 4
+    assert flight.stats() == {"upstream": 1, "shared": 3, "in_flight": 0}
+
+
+def test_single_flight_propagates_errors_to_every_caller():
+    flight = server.SingleFlight()
+    error = RuntimeError("upstream down")
+
+    def fail():
+        raise error
+
+    outcomes = _join_in_flight(flight, "k", fail)
+
+    assert outcomes == [("error", error)] * 4
+    assert flight.do("k", lambda: "retried") == "retried"  # Failure is not cached
+
+
+def test_single_flight_only_joins_calls_started_after_not_before():
+    import threading
+    import time
+
+    flight = server.SingleFlight()
+    release = threading.Event()
+    stale = []
+
+    def old_poll():
+        release.wait(5)
+        return "old"
+
+    thread = threading.Thread(target=lambda: stale.append(flight.do("running", old_poll)))
+    thread.start()
+    while flight.stats()["in_flight"] == 0:
+        pass
+
+    asked = time.monotonic()
+    assert flight.do("running", lambda: "fresh", not_before=asked) == "fresh"
+    release.set()
+    thread.join(5)
+
+    assert stale == ["old"]
+    assert flight.stats() == {"upstream": 2, "shared": 0, "in_flight": 0}
+
+
+# ------------------------------------------------------------------------------
+# Speech playback
+# ------------------------------------------------------------------------------
+
+def test_choreographed_speech_synthesizes_chunks_concurrently(monkeypatch, tmp_path):
+    import time
+
+    events = []
+
+    def slow_tts(text, voice=None):
+        time.sleep(0.3)
+        path = tmp_path / f"{text}.wav"
+        path.write_bytes(b"")
+        return str(path)
+
+    def play(robot, path):
+        assert server._speaker_lock.locked()
+        events.append(("play", os.path.basename(path)))
+
+    monkeypatch.setattr(server, "get_robot", lambda: FakeRobot())
+    monkeypatch.setattr(server, "text_to_speech", slow_tts)
+    monkeypatch.setattr(server, "_play_to_end", play)
+    monkeypatch.setattr(server, "_do_move", lambda name: events.append(("move", name)))
+    monkeypatch.setattr(server, "_wait_for_moves_complete", lambda timeout: True)
+
+    start = time.monotonic()
+    result = server._do_speak("[move:joy1] one [move:fear1] two three")
+
+    assert time.monotonic() - start < 0.55  # Two chunks, one TTS round trip
+    assert events == [
+        ("move", "joy1"), ("play", "one.wav"), ("move", "fear1"), ("play", "two three.wav"),
+    ]
+    assert result.startswith("Performed: 'one two three'")
+    assert list(tmp_path.iterdir()) == []  # Temp audio cleaned up
+
+
+def test_audio_duration_ignores_streamed_wav_placeholder_length(tmp_path):
+    import wave
+
+    path = tmp_path / "speech.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(24000)
+        wav.writeframes(b"\0\0" * 12000)
+    data = bytearray(path.read_bytes())
+    data[40:44] = b"\xff\xff\xff\xff"  # Data size unknown, as when streamed
+    path.write_bytes(bytes(data))
+
+    assert server.audio_duration(str(path)) == pytest.approx(0.5)
+    assert server.audio_duration(str(tmp_path / "missing.wav")) == 0.0